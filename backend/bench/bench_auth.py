@@ -0,0 +1,72 @@
+"""
+Benchmark: login throughput and event-loop stall while password checks run.
+
+Runs a burst of concurrent bcrypt verifications two ways — inline on the
+event loop (the old behaviour) and through utils.auth's bounded executor —
+while a probe coroutine stands in for an interview turn, waking every
+10 ms and recording how late it was scheduled:
+
+    python -m bench.bench_auth --logins 40 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import bcrypt
+
+PROBE_INTERVAL = 0.01
+
+
+async def _probe(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+
+async def _blocking_verify(plain: str, hashed: str) -> bool:
+    return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+
+
+async def _run(name: str, verify, hashed: str, logins: int):
+    stop = asyncio.Event()
+    lags: list = []
+    probe = asyncio.create_task(_probe(stop, lags))
+    await asyncio.sleep(PROBE_INTERVAL * 2)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[verify("correct horse", hashed) for _ in range(logins)])
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+    print(
+        f"{name:<10} logins/s: {logins / elapsed:7.1f}   "
+        f"turn-probe lag p50: {statistics.median(lags) if lags else 0.0:7.1f} ms   "
+        f"p99: {p99:7.1f} ms   max: {max(lags) if lags else 0.0:7.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt work factor")
+    parser.add_argument("--workers", type=int, default=2, help="AUTH_HASH_WORKERS")
+    args = parser.parse_args()
+
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["AUTH_HASH_WORKERS"] = str(args.workers)
+    from utils.auth import verify_password
+
+    hashed = bcrypt.hashpw(b"correct horse", bcrypt.gensalt(args.rounds)).decode("utf-8")
+    print(f"{args.logins} logins, bcrypt rounds={args.rounds}, hash workers={args.workers}")
+    await _run("inline", _blocking_verify, hashed, args.logins)
+    await _run("executor", verify_password, hashed, args.logins)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
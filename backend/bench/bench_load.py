@@ -0,0 +1,315 @@
+"""
+Load test: the full backend against a fake LLM and an in-memory database.
+
+Boots main.app in-process with its real routers, services and background
+workers, points the OpenAI client at a local fake OpenAI-compatible server
+(configurable time to first token and token rate) and uses mongomock-motor
+as the database, so it runs offline with reproducible numbers. Each virtual
+user registers, starts a session with a PDF resume, plays the interview
+turns, ends the session and waits for the feedback report:
+
+    python -m bench.bench_load --users 50 --concurrency 10 --llm-ttft-ms 400
+
+Reports p50 / p95 / p99 latency and requests per second per endpoint. Pass
+--mongo-uri to use a real (e.g. local) MongoDB instead; mongomock-motor is
+only needed for the in-memory default (pip install mongomock-motor).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+
+# ─── Fake OpenAI-compatible server ────────────────────────────────────────────
+
+def _fake_llm_app(ttft: float, tokens_per_second: float, reply_tokens: int):
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, Response, StreamingResponse
+    from starlette.routing import Route
+
+    def _turn() -> str:
+        return json.dumps({
+            "reply": " ".join(["Walk me through how you would design it"] * max(1, reply_tokens // 8)) + "?",
+            "score": random.randint(3, 9),
+            "feedback": "Reasonable answer, but light on concrete detail.",
+            "weak_points": ["depth", "trade-offs"],
+            "is_follow_up": random.random() < 0.3,
+            "interview_complete": False,
+        })
+
+    def _report() -> str:
+        return json.dumps({
+            "overall_score": random.randint(50, 90),
+            "category_scores": {"Technical Depth": 70, "Communication": 75, "Problem Solving": 68, "Behavioral Fit": 80},
+            "strengths": ["Clear structure", "Good fundamentals"],
+            "improvements": ["Quantify impact", "Discuss trade-offs"],
+            "summary": "Solid interview with room to go deeper on design decisions.",
+            "recommendation": "Hire",
+        })
+
+    def _pieces(text: str):
+        # ~4 characters per token
+        return [text[i:i + 4] for i in range(0, len(text), 4)]
+
+    async def completions(request):
+        body = await request.json()
+        is_report = any("overall_score" in (m.get("content") or "") for m in body["messages"] if m["role"] == "system")
+        text = _report() if is_report else _turn()
+        pieces = _pieces(text)
+        usage = {
+            "prompt_tokens": sum(len(m.get("content") or "") for m in body["messages"]) // 4,
+            "completion_tokens": len(pieces),
+            "total_tokens": 0,
+        }
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "created": int(time.time()), "model": body["model"]}
+
+        if not body.get("stream"):
+            await asyncio.sleep(ttft + len(pieces) / tokens_per_second)
+            return JSONResponse({
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        async def events():
+            await asyncio.sleep(ttft)
+            for piece in pieces:
+                chunk = {**base, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(1 / tokens_per_second)
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield f"data: {json.dumps({**base, 'object': 'chat.completion.chunk', 'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def anything(request):
+        return Response(status_code=204)
+
+    return Starlette(routes=[
+        Route("/v1/chat/completions", completions, methods=["POST"]),
+        Route("/v1", anything, methods=["GET", "HEAD"]),
+    ])
+
+
+def _start_fake_llm(args) -> str:
+    """Serve the fake LLM from its own thread and event loop; returns its base URL."""
+    import uvicorn
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    app = _fake_llm_app(args.llm_ttft_ms / 1000, args.llm_tokens_per_sec, args.reply_tokens)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/v1"
+
+
+# ─── Virtual users ────────────────────────────────────────────────────────────
+
+def _resume_pdf(name: str) -> bytes:
+    """A one-page PDF with a line of text — enough for pdfplumber to extract."""
+    stream = f"BT /F1 12 Tf 72 720 Td ({name} - Senior Python engineer, 6 years, FastAPI and MongoDB) Tj ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out, offsets = "%PDF-1.4\n", []
+    for i, obj in enumerate(objects):
+        offsets.append(len(out))
+        out += f"{i + 1} 0 obj\n{obj}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF"
+    return out.encode()
+
+
+class _Recorder:
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, label: str, request, expect=(200, 201, 202)):
+        start = time.perf_counter()
+        response = await request
+        self.timings[label].append((time.perf_counter() - start) * 1000)
+        if response.status_code not in expect:
+            self.errors[label] += 1
+            raise RuntimeError(f"{label} -> {response.status_code}: {response.text[:200]}")
+        return response
+
+
+async def _virtual_user(client, rec: _Recorder, index: int, args):
+    email = f"load-{uuid.uuid4().hex[:10]}@example.com"
+    r = await rec.call("POST /auth/register", client.post(
+        "/auth/register", json={"name": f"User {index}", "email": email, "password": "bench-password"},
+    ))
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    r = await rec.call("POST /sessions/start", client.post(
+        "/sessions/start",
+        data={
+            "role": "Backend Engineer", "level": "senior", "rounds": "technical,behavioral",
+            "job_description": "Build and scale Python services on FastAPI and MongoDB.",
+        },
+        files={"resume": ("resume.pdf", _resume_pdf(f"Candidate {index % args.distinct_resumes}"), "application/pdf")},
+        headers=headers,
+    ))
+    session_id = r.json()["id"]
+
+    path = "/interview/message/stream" if args.stream else "/interview/message"
+    for turn in range(args.turns):
+        content = "Hello, I am ready to begin the interview." if turn == 0 else (
+            "I would start by profiling the hot path, then batch the writes and cache the reads. " * 3
+        )
+        r = await rec.call(f"POST {path}", client.post(
+            path, json={"session_id": session_id, "content": content}, headers=headers,
+        ))
+        if args.stream and "event: turn" not in r.text:
+            rec.errors[f"POST {path}"] += 1
+        await asyncio.sleep(args.think_ms / 1000)
+
+    await rec.call("POST /interview/end", client.post(f"/interview/end/{session_id}", headers=headers))
+
+    start = time.perf_counter()
+    r = await rec.call("POST /feedback/generate", client.post(f"/feedback/generate/{session_id}", headers=headers))
+    if r.status_code == 202:
+        job_id = r.json()["job_id"]
+        while True:
+            await asyncio.sleep(args.poll_ms / 1000)
+            r = await rec.call("GET /feedback/jobs", client.get(f"/feedback/jobs/{job_id}", headers=headers))
+            if r.json()["status"] in ("done", "failed"):
+                break
+        await rec.call("GET /feedback", client.get(f"/feedback/{session_id}", headers=headers))
+    rec.timings["feedback ready (end-to-end)"].append((time.perf_counter() - start) * 1000)
+
+
+# ─── Harness ──────────────────────────────────────────────────────────────────
+
+def _pct(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def _report(rec: _Recorder, wall: float, failed_users: int, args):
+    print(f"\n{args.users} users, concurrency {args.concurrency}, {args.turns} turns each, "
+          f"{'streaming' if args.stream else 'non-streaming'} — {wall:.1f} s wall, {failed_users} users failed")
+    print(f"{'endpoint':<34}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}")
+    total = 0
+    for label, values in rec.timings.items():
+        is_request = label.startswith(("GET", "POST"))
+        total += len(values) if is_request else 0
+        rps = f"{len(values) / wall:9.1f}" if is_request else f"{'':>9}"
+        print(f"{label:<34}{len(values):>7}{rec.errors[label]:>8}"
+              f"{_pct(values, 0.5):>10.1f}{_pct(values, 0.95):>10.1f}{_pct(values, 0.99):>10.1f}{rps}")
+    print(f"{'all requests':<34}{total:>7}{sum(rec.errors.values()):>8}{'':>30}{total / wall:9.1f}")
+
+
+async def _setup_db(args):
+    from db import mongo
+    from db.repository import ensure_indexes
+
+    if args.mongo_uri:
+        await mongo.connect_db()
+        return
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise SystemExit("The in-memory database needs mongomock-motor (pip install mongomock-motor), or pass --mongo-uri")
+    mongo.client = AsyncMongoMockClient()
+    mongo.db = mongo.client["interviewiq_bench"]
+    await ensure_indexes(mongo.db)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=6, help="interview requests per user, greeting included")
+    parser.add_argument("--stream", action="store_true", help="use POST /interview/message/stream")
+    parser.add_argument("--think-ms", type=float, default=0, help="pause between a user's turns")
+    parser.add_argument("--poll-ms", type=float, default=250, help="feedback job polling interval")
+    parser.add_argument("--llm-ttft-ms", type=float, default=300, help="fake LLM time to first token")
+    parser.add_argument("--llm-tokens-per-sec", type=float, default=200, help="fake LLM output rate")
+    parser.add_argument("--reply-tokens", type=int, default=60, help="length of the fake interviewer reply")
+    parser.add_argument("--distinct-resumes", type=int, default=10, help="users share this many resume PDFs")
+    parser.add_argument("--bcrypt-rounds", type=int, default=10)
+    parser.add_argument("--rate-limit", action="store_true", help="keep per-user rate limits on")
+    parser.add_argument("--mongo-uri", help="use this MongoDB instead of the in-memory stand-in")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    # The app's load_dotenv(override=True) rewrites os.environ from backend/.env on
+    # import, so these are applied before the import and again after it — a local
+    # .env must never point the bench at the real OpenRouter or its key
+    overrides = {
+        "OPENROUTER_BASE_URL": _start_fake_llm(args),
+        "OPENROUTER_API_KEY": "bench",
+        "BCRYPT_ROUNDS": str(args.bcrypt_rounds),
+        "RATE_LIMIT_ENABLED": "true" if args.rate_limit else "false",
+        "MONGO_EXPLAIN_ON_STARTUP": "false",
+    }
+    if args.mongo_uri:
+        overrides["MONGO_URI"] = args.mongo_uri
+    os.environ.update(overrides)
+
+    import httpx
+    import main as app_main
+    from db import mongo
+    from services import gemini
+    from services.feedback_jobs import start_feedback_workers, stop_feedback_workers
+    from services.pdf_parser import shutdown_pdf_pool
+    from utils import auth, rate_limit
+
+    os.environ.update(overrides)
+    gemini.OPENROUTER_BASE = overrides["OPENROUTER_BASE_URL"]
+    auth.BCRYPT_ROUNDS = args.bcrypt_rounds
+    rate_limit.RATE_LIMIT_ENABLED = args.rate_limit
+    mongo.MONGO_URI = overrides.get("MONGO_URI", mongo.MONGO_URI)
+    await _setup_db(args)
+    await gemini.init_llm_client()
+    await start_feedback_workers()
+
+    rec = _Recorder()
+    slots = asyncio.Semaphore(args.concurrency)
+    failed = 0
+
+    async def run_user(client, i):
+        nonlocal failed
+        async with slots:
+            try:
+                await _virtual_user(client, rec, i, args)
+            except Exception as e:
+                failed += 1
+                print(f"user {i} failed: {e}")
+
+    transport = httpx.ASGITransport(app=app_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[run_user(client, i) for i in range(args.users)])
+        wall = time.perf_counter() - start
+
+    await stop_feedback_workers()
+    shutdown_pdf_pool()
+    await gemini.close_llm_client()
+    _report(rec, wall, failed, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
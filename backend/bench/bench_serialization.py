@@ -0,0 +1,125 @@
+"""
+Benchmark: response serialization for a feedback report and a session page.
+
+Times the body each route renders, with no network or database involved, two ways:
+"standard" is what FastAPI does with its default response class (a dict goes
+through jsonable_encoder + json.dumps; a model page is validated
+when built, validated again against response_model and then dumped)
+and "fast" is the utils.responses path (model-shaped dicts + orjson):
+
+    python -m bench.bench_serialization --messages 50 --repeat 2000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from models.session import SessionListItem
+from utils.responses import dumps
+
+_ANSWER = "I would start by profiling the hot path, then cache the expensive lookups and batch the writes. " * 4
+
+
+def _report(messages: int) -> dict:
+    transcript = [
+        {
+            "role": "ai" if i % 2 == 0 else "user",
+            "content": _ANSWER,
+            "score": None if i % 2 == 0 else 7.5,
+            "feedback": None if i % 2 == 0 else "Clear structure; quantify the impact next time.",
+            "weak_points": [] if i % 2 == 0 else ["no metrics", "skipped trade-offs"],
+        }
+        for i in range(messages)
+    ]
+    return {
+        "session_id": str(ObjectId()),
+        "role": "Backend Engineer",
+        "level": "senior",
+        "rounds": ["technical", "behavioral"],
+        "overall_score": 7.2,
+        "category_scores": {"Technical Knowledge": 7.5, "Communication": 7.0, "Problem Solving": 7.1},
+        "strengths": ["Structured answers", "Good system design instincts"],
+        "improvements": ["Quantify impact", "Discuss trade-offs explicitly"],
+        "summary": "Solid senior-level performance with room to sharpen delivery. " * 3,
+        "recommendation": "Hire",
+        "transcript": transcript,
+    }
+
+
+def _session_docs(count: int) -> List[dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(), "role": "Backend Engineer", "level": "senior",
+            "rounds": ["technical", "behavioral"], "status": "completed",
+            "created_at": now - timedelta(hours=i), "overall_score": 7.0, "question_count": 8,
+        }
+        for i in range(count)
+    ]
+
+
+def _page_fields(doc: dict) -> dict:
+    return dict(
+        id=str(doc["_id"]), role=doc["role"], level=doc["level"], rounds=doc["rounds"],
+        status=doc["status"], created_at=doc["created_at"],
+        overall_score=doc.get("overall_score"), question_count=doc.get("question_count", 0),
+    )
+
+
+_PAGE = TypeAdapter(List[SessionListItem])
+
+
+def _standard_page(docs: List[dict]) -> bytes:
+    items = [SessionListItem(**_page_fields(doc)) for doc in docs]
+    return _PAGE.dump_json(_PAGE.validate_python(items))
+
+
+def _fast_page(docs: List[dict]) -> bytes:
+    return dumps([_page_fields(doc) for doc in docs])
+
+
+def _standard_report(report: dict) -> bytes:
+    return json.dumps(jsonable_encoder(report), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _fast_report(report: dict) -> bytes:
+    return dumps(report)
+
+
+def _time(fn, arg, repeat: int) -> float:
+    fn(arg)     # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=50, help="transcript length of the feedback report")
+    parser.add_argument("--sessions", type=int, default=50, help="items on the session list page")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    report, docs = _report(args.messages), _session_docs(args.sessions)
+    assert json.loads(_standard_report(report)) == json.loads(_fast_report(report))
+    assert json.loads(_standard_page(docs)) == json.loads(_fast_page(docs))
+
+    for name, payload, standard, fast in (
+        (f"feedback report, {args.messages} messages", report, _standard_report, _fast_report),
+        (f"session page, {args.sessions} items", docs, _standard_page, _fast_page),
+    ):
+        slow_us, fast_us = _time(standard, payload, args.repeat), _time(fast, payload, args.repeat)
+        print(
+            f"{name:<34} {len(fast(payload)):>7} bytes   standard: {slow_us:8.1f} µs   "
+            f"fast: {fast_us:7.1f} µs   ({slow_us / fast_us:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
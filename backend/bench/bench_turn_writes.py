@@ -0,0 +1,162 @@
+"""
+Benchmark: Mongo round trips and write latency for one interview turn.
+
+Compares the original four sequential writes in send_message against
+db.repository.persist_turn. By default it runs against an in-process stand-in
+that sleeps for a simulated network round trip on every operation, so the
+numbers reflect round-trip count rather than server work:
+
+    python -m bench.bench_turn_writes --rtt-ms 40 --turns 50
+
+Pass --mongo-uri to run the same comparison against a real deployment.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+from db.repository import persist_turn
+
+
+class _SimCollection:
+    def __init__(self, rtt: float, counter: dict):
+        self.rtt = rtt
+        self.counter = counter
+        self.docs = {}
+
+    async def _round_trip(self):
+        self.counter["round_trips"] += 1
+        await asyncio.sleep(self.rtt)
+
+    async def insert_one(self, doc):
+        await self._round_trip()
+        doc.setdefault("_id", ObjectId())
+        self.docs[doc["_id"]] = doc
+
+    async def insert_many(self, docs, ordered=True, session=None):
+        await self._round_trip()
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+            self.docs[doc["_id"]] = doc
+
+    async def update_one(self, query, update, session=None):
+        await self._round_trip()
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"]})
+        doc.update(update.get("$set", {}))
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None, session=None):
+        await self._round_trip()
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"], "question_count": 0})
+        doc.update(update.get("$set", {}))
+        for key, inc in update.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + inc
+        return doc
+
+
+class _SimDB:
+    def __init__(self, rtt: float):
+        self.counter = {"round_trips": 0}
+        self._collections = {}
+        self.rtt = rtt
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = _SimCollection(self.rtt, self.counter)
+        return self._collections[name]
+
+
+def _docs(session_id: str):
+    user_msg = {
+        "_id": ObjectId(), "session_id": session_id, "role": "user", "content": "answer " * 50,
+        "score": None, "feedback": None, "weak_points": [], "timestamp": datetime.utcnow(),
+    }
+    ai_msg = {
+        "_id": ObjectId(), "session_id": session_id, "role": "ai", "content": "question " * 40,
+        "timestamp": datetime.utcnow(),
+    }
+    return user_msg, ai_msg
+
+
+async def legacy_turn(db, session_id: str):
+    """The four sequential writes send_message used to issue."""
+    user_msg, ai_msg = _docs(session_id)
+    user_msg.pop("_id")
+    ai_msg.pop("_id")
+    await db["messages"].insert_one(user_msg)
+    await db["messages"].update_one(
+        {"_id": user_msg["_id"]},
+        {"$set": {"score": 7, "feedback": "ok", "weak_points": []}},
+    )
+    await db["messages"].insert_one(ai_msg)
+    await db["sessions"].update_one({"_id": ObjectId(session_id)}, {"$set": {"question_count": 1}})
+
+
+async def batched_turn(db, session_id: str):
+    user_msg, ai_msg = _docs(session_id)
+    user_msg.update({"score": 7, "feedback": "ok"})
+    await persist_turn(db, session_id, user_msg, ai_msg, 1, {"context_summary": "", "context_summarized": 0})
+
+
+async def _run(name: str, fn, db, session_id: str, turns: int, counter: dict):
+    counter["round_trips"] = 0
+    timings = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        await fn(db, session_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(
+        f"{name:<10} round trips/turn: {counter['round_trips'] / turns:4.1f}   "
+        f"p50: {statistics.median(timings):7.1f} ms   p95: {p95:7.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rtt-ms", type=float, default=40.0, help="simulated round trip (ignored with --mongo-uri)")
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--mongo-uri", help="benchmark against a real MongoDB instead of the simulator")
+    args = parser.parse_args()
+
+    if args.mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from pymongo import monitoring
+
+        counter = {"round_trips": 0}
+
+        class _Counter(monitoring.CommandListener):
+            def started(self, event):
+                counter["round_trips"] += 1
+
+            def succeeded(self, event):
+                pass
+
+            def failed(self, event):
+                pass
+
+        client = AsyncIOMotorClient(args.mongo_uri, event_listeners=[_Counter()])
+        db = client["interviewiq_bench"]
+        print(f"Target: {args.mongo_uri}")
+    else:
+        db = _SimDB(args.rtt_ms / 1000)
+        counter = db.counter
+        print(f"Target: simulated MongoDB, {args.rtt_ms:.0f} ms per round trip")
+
+    session_id = str(ObjectId())
+    if args.mongo_uri:
+        await db["sessions"].insert_one({"_id": ObjectId(session_id), "question_count": 0})
+
+    await _run("before", legacy_turn, db, session_id, args.turns, counter)
+    await _run("after", batched_turn, db, session_id, args.turns, counter)
+
+    if args.mongo_uri:
+        await client.drop_database("interviewiq_bench")
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
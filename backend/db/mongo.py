@@ -1,30 +1,35 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import ASCENDING
 import os
 from dotenv import load_dotenv
 
+from db.repository import ensure_indexes, check_query_plans
+
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+# Wrap each turn's writes in a multi-document transaction (replica sets / Atlas only)
+MONGO_TURN_TRANSACTIONS = os.getenv("MONGO_TURN_TRANSACTIONS", "false").lower() == "true"
 
 client: AsyncIOMotorClient = None  # type: ignore
 db = None
+supports_transactions = False
 
 
 async def connect_db():
-    global client, db
+    global client, db, supports_transactions
     client = AsyncIOMotorClient(MONGO_URI)
     db = client["interviewiq"]
 
-    # Create indexes
-    await db["users"].create_index([("email", ASCENDING)], unique=True)
-    await db["sessions"].create_index([("user_id", ASCENDING)])
-    await db["messages"].create_index([("session_id", ASCENDING)])
+    # Transactions need a replica set or a sharded cluster
+    hello = await db.command("hello")
+    supports_transactions = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+
+    await ensure_indexes(db)
+    await check_query_plans(db)
     print("✅ Connected to MongoDB")
 
 
 async def close_db():
-    global client
     if client:
         client.close()
         print("MongoDB connection closed")
@@ -32,3 +37,7 @@ async def close_db():
 
 def get_db():
     return db
+
+
+def use_transactions() -> bool:
+    return MONGO_TURN_TRANSACTIONS and supports_transactions
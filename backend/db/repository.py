@@ -0,0 +1,669 @@
+"""
+Data-access layer — every MongoDB query the routers make lives here.
+
+Each read uses a projection sized for its endpoint, so list and feedback
+pages never ship resume_text / job_description, and every filter + sort is
+backed by one of the compound indexes created in ensure_indexes().
+check_query_plans() explains the hot queries at startup and warns about
+collection scans or in-memory sorts.
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+
+# ─── Projections ──────────────────────────────────────────────────────────────
+
+USER_FIELDS = {"name": 1, "email": 1, "created_at": 1}
+LOGIN_FIELDS = {**USER_FIELDS, "hashed_password": 1}
+
+TURN_SESSION_FIELDS = {
+    "user_id": 1, "role": 1, "level": 1, "rounds": 1, "current_round": 1, "status": 1,
+    "resume_id": 1, "resume_text": 1, "job_description": 1, "question_count": 1,
+    "context_summary": 1, "context_summarized": 1,
+}
+SESSION_OUT_FIELDS = {
+    "user_id": 1, "role": 1, "level": 1, "rounds": 1, "status": 1, "created_at": 1,
+    "completed_at": 1, "overall_score": 1, "category_scores": 1, "question_count": 1,
+}
+SESSION_LIST_FIELDS = {
+    "role": 1, "level": 1, "rounds": 1, "status": 1, "created_at": 1,
+    "overall_score": 1, "question_count": 1,
+}
+REPORT_FIELDS = {
+    "role": 1, "level": 1, "rounds": 1, "overall_score": 1, "category_scores": 1,
+    "strengths": 1, "improvements": 1, "summary": 1, "recommendation": 1, "report_hash": 1,
+    "stats_contribution": 1, "completed_at": 1, "created_at": 1,
+}
+
+RESCORE_SESSION_FIELDS = {
+    **REPORT_FIELDS, "user_id": 1, "report_versions": 1, "report_version": 1,
+    "report_fallback": 1,
+}
+EXPORT_SESSION_FIELDS = {
+    **SESSION_OUT_FIELDS, "strengths": 1, "improvements": 1, "summary": 1, "recommendation": 1,
+}
+
+HISTORY_FIELDS = {"role": 1, "content": 1, "score": 1}
+TRANSCRIPT_FIELDS = {"_id": 0, "role": 1, "content": 1, "score": 1, "feedback": 1, "weak_points": 1}
+EXPORT_MESSAGE_FIELDS = {**TRANSCRIPT_FIELDS, "session_id": 1, "timestamp": 1}
+
+
+# ─── Indexes & query plans ────────────────────────────────────────────────────
+
+async def ensure_indexes(db):
+    await db["users"].create_index([("email", ASCENDING)], unique=True)
+    await db["sessions"].create_index(
+        [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+    )
+    await db["sessions"].create_index([("created_at", DESCENDING), ("_id", DESCENDING)])   # admin exports
+    await db["messages"].create_index([("session_id", ASCENDING), ("timestamp", ASCENDING)])
+    await db["feedback_jobs"].create_index(
+        [("session_id", ASCENDING), ("transcript_hash", ASCENDING)], unique=True,
+    )
+    await db["feedback_jobs"].create_index([("status", ASCENDING), ("lease_until", ASCENDING)])
+    await db["llm_usage"].create_index([("user_id", ASCENDING), ("created_at", ASCENDING)])
+    await db["opening_turns"].create_index("expires_at", expireAfterSeconds=0)
+    await db["report_versions"].create_index([("session_id", ASCENDING), ("version", ASCENDING)], unique=True)
+    await db["report_versions"].create_index([("run_id", ASCENDING), ("session_id", ASCENDING)])
+
+
+# Prefixes of the compound indexes above, left over from older deployments;
+# scripts/drop_redundant_indexes.py removes them
+REDUNDANT_INDEXES = (
+    ("sessions", "user_id_1"),
+    ("sessions", "user_id_1_created_at_-1"),
+    ("messages", "session_id_1"),
+)
+
+
+async def redundant_indexes(db) -> List[Tuple[str, str]]:
+    """The REDUNDANT_INDEXES that still exist."""
+    found = []
+    for collection, name in REDUNDANT_INDEXES:
+        if name in await db[collection].index_information():
+            found.append((collection, name))
+    return found
+
+
+async def drop_index(db, collection: str, name: str):
+    await db[collection].drop_index(name)
+
+
+def _plan_stages(plan: Dict) -> List[str]:
+    stages = [plan.get("stage", "")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return stages
+
+
+async def check_query_plans(db):
+    """Explain the hot router queries and warn about COLLSCAN / in-memory SORT stages."""
+    # Read at call time: this module is imported before db.mongo loads .env
+    if os.getenv("MONGO_EXPLAIN_ON_STARTUP", "true").lower() != "true":
+        return
+    probe_user, probe_session = "000000000000000000000000", "000000000000000000000000"
+    queries = {
+        "sessions by user": db["sessions"].find({"user_id": probe_user}).sort(
+            [("created_at", DESCENDING), ("_id", DESCENDING)]
+        ),
+        "sessions by date": db["sessions"].find({"created_at": {"$gte": datetime(2000, 1, 1)}}).sort(
+            [("created_at", DESCENDING), ("_id", DESCENDING)]
+        ),
+        "session by id": db["sessions"].find({"_id": ObjectId(probe_session), "user_id": probe_user}),
+        "messages by session": db["messages"].find({"session_id": probe_session}).sort("timestamp", ASCENDING),
+        "user by email": db["users"].find({"email": "probe@example.com"}),
+    }
+    for name, cursor in queries.items():
+        try:
+            explain = await cursor.explain()
+        except Exception as e:
+            print(f"⚠️  Could not explain '{name}': {e}")
+            continue
+        stages = _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        if "COLLSCAN" in stages:
+            print(f"⚠️  Query '{name}' uses a collection scan")
+        elif "SORT" in stages:
+            print(f"⚠️  Query '{name}' sorts in memory")
+
+
+# ─── Users ────────────────────────────────────────────────────────────────────
+
+async def find_user_by_email(db, email: str, projection: Dict = USER_FIELDS) -> Optional[Dict]:
+    return await db["users"].find_one({"email": email}, projection)
+
+
+async def get_user(db, user_id: str) -> Optional[Dict]:
+    return await db["users"].find_one({"_id": ObjectId(user_id)}, USER_FIELDS)
+
+
+async def insert_user(db, user_doc: Dict) -> str:
+    result = await db["users"].insert_one(user_doc)
+    return str(result.inserted_id)
+
+
+async def update_password_hash(db, user_id, hashed_password: str):
+    await db["users"].update_one({"_id": user_id}, {"$set": {"hashed_password": hashed_password}})
+
+
+# ─── Resumes ──────────────────────────────────────────────────────────────────
+# Extracted resume text is stored once per PDF, keyed by the SHA-256 of its bytes
+
+async def get_resume_text(db, resume_id: str) -> Optional[str]:
+    doc = await db["resumes"].find_one({"_id": resume_id}, {"text": 1})
+    return doc["text"] if doc else None
+
+
+async def save_resume(db, resume_id: str, text: str):
+    await db["resumes"].update_one(
+        {"_id": resume_id},
+        {"$setOnInsert": {"text": text, "created_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+
+# ─── Opening turns ────────────────────────────────────────────────────────────
+
+async def get_opening_variants(db, key: str) -> List[Dict]:
+    doc = await db["opening_turns"].find_one({"_id": key}, {"variants": 1})
+    return doc["variants"] if doc else []
+
+
+async def push_opening_variant(db, key: str, reply: str, max_variants: int, expires_at: datetime):
+    """Add a variant to the pool for `key`, keeping only the newest `max_variants`."""
+    await db["opening_turns"].update_one(
+        {"_id": key},
+        {
+            "$push": {"variants": {
+                "$each": [{"reply": reply, "created_at": datetime.utcnow()}],
+                "$slice": -max_variants,
+            }},
+            "$set": {"expires_at": expires_at},
+        },
+        upsert=True,
+    )
+
+
+# ─── Sessions ─────────────────────────────────────────────────────────────────
+
+async def insert_session(db, session_doc: Dict) -> str:
+    result = await db["sessions"].insert_one(session_doc)
+    return str(result.inserted_id)
+
+
+async def get_session(db, session_id: str, user_id: str, projection: Dict, **filters) -> Optional[Dict]:
+    return await db["sessions"].find_one(
+        {"_id": ObjectId(session_id), "user_id": user_id, **filters},
+        projection,
+    )
+
+
+async def list_sessions(
+    db,
+    user_id: str,
+    limit: int = 20,
+    after: Optional[Tuple[datetime, ObjectId]] = None,
+    status: Optional[str] = None,
+    role: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Newest-first page of a user's sessions. `after` is the (created_at, _id)
+    of the last session on the previous page — a keyset, so deep pages cost
+    the same as the first one.
+    """
+    query: Dict[str, Any] = {"user_id": user_id}
+    if status:
+        query["status"] = status
+    if role:
+        query["role"] = role
+    if after:
+        created_at, last_id = after
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}},
+        ]
+    cursor = db["sessions"].find(
+        query,
+        SESSION_LIST_FIELDS,
+        sort=[("created_at", DESCENDING), ("_id", DESCENDING)],
+        limit=limit,
+    )
+    return [doc async for doc in cursor]
+
+
+async def complete_session(db, session_id: str, user_id: str) -> bool:
+    """Mark a session completed; False if it doesn't exist or isn't the user's."""
+    result = await db["sessions"].update_one(
+        {"_id": ObjectId(session_id), "user_id": user_id},
+        {"$set": {"status": "completed", "completed_at": datetime.utcnow()}},
+    )
+    return result.matched_count > 0
+
+
+async def save_report(
+    db,
+    session_id: str,
+    report: Dict[str, Any],
+    report_hash: Optional[str] = None,
+    stats_contribution: Optional[Dict] = None,
+    report_version: Optional[int] = None,
+):
+    """
+    Store the report; `report_hash` marks which transcript it was generated
+    from (None = regenerate next time), `stats_contribution` what it
+    added to the user's stats (see services.user_stats) and `report_version`
+    which report_versions entry it is, if any.
+    """
+    usage = report.get("usage")
+    update = {
+        "$set": {
+            "overall_score": report.get("overall_score"),
+            "category_scores": report.get("category_scores", {}),
+            "strengths": report.get("strengths", []),
+            "improvements": report.get("improvements", []),
+            "summary": report.get("summary", ""),
+            "recommendation": report.get("recommendation", ""),
+            "report_hash": report_hash,
+            "report_fallback": bool(report.get("is_fallback")),
+            "feedback_usage": usage,
+            "stats_contribution": stats_contribution,
+            "report_version": report_version,
+            "status": "completed",
+        },
+    }
+    if usage:
+        update["$inc"] = usage_increments(usage)
+    await db["sessions"].update_one({"_id": ObjectId(session_id)}, update)
+
+
+async def scored_sessions(db, user_id: str) -> List[Dict]:
+    """A user's sessions with a real (non-fallback) report, oldest first — for rebuilding stats."""
+    cursor = db["sessions"].find(
+        {"user_id": user_id, "overall_score": {"$ne": None}, "report_fallback": {"$ne": True}},
+        REPORT_FIELDS,
+        sort=[("created_at", ASCENDING), ("_id", ASCENDING)],
+    )
+    return [doc async for doc in cursor]
+
+
+async def set_stats_contribution(db, session_id, contribution: Optional[Dict]):
+    await db["sessions"].update_one({"_id": ObjectId(session_id)}, {"$set": {"stats_contribution": contribution}})
+
+
+# ─── User stats ───────────────────────────────────────────────────────────────
+
+async def get_user_stats(db, user_id: str) -> Optional[Dict]:
+    return await db["user_stats"].find_one({"_id": user_id})
+
+
+async def update_user_stats(db, user_id: str, update: Dict):
+    await db["user_stats"].update_one({"_id": user_id}, update, upsert=True)
+
+
+async def set_last_score(db, user_id: str, score: float, at):
+    """Make `score` the user's last one unless a session completed after `at` already is."""
+    await db["user_stats"].update_one(
+        {"_id": user_id, "$or": [{"last_scored_at": {"$lte": at}}, {"last_scored_at": None}]},
+        {"$set": {"last_score": score, "last_scored_at": at}},
+    )
+
+
+async def best_report_score(db, user_id: str) -> Optional[float]:
+    """Highest overall score among the user's sessions that count towards their stats."""
+    session = await db["sessions"].find_one(
+        {"user_id": user_id, "stats_contribution": {"$ne": None}},
+        {"stats_contribution.overall": 1},
+        sort=[("stats_contribution.overall", DESCENDING)],
+    )
+    return session["stats_contribution"]["overall"] if session else None
+
+
+async def pull_stats_trend(db, user_id: str, session_id: str, categories: List[str]):
+    """Remove a session's points from the overall and per-category trend lines."""
+    match = {"session_id": session_id}
+    await db["user_stats"].update_one(
+        {"_id": user_id},
+        {"$pull": {"recent_scores": match, **{f"categories.{c}.recent": match for c in categories}}},
+    )
+
+
+async def replace_user_stats(db, user_id: str, doc: Dict):
+    await db["user_stats"].replace_one({"_id": user_id}, doc, upsert=True)
+
+
+async def user_ids_with_reports(db) -> List[str]:
+    return await db["sessions"].distinct("user_id", {"overall_score": {"$ne": None}})
+
+
+# ─── Messages ─────────────────────────────────────────────────────────────────
+
+async def list_messages(db, session_id: str, projection: Dict = TRANSCRIPT_FIELDS) -> List[Dict]:
+    cursor = db["messages"].find(
+        {"session_id": session_id},
+        projection,
+        sort=[("timestamp", ASCENDING)],
+    )
+    return [msg async for msg in cursor]
+
+
+# ─── Export ───────────────────────────────────────────────────────────────────
+
+async def _with_messages(db, sessions: List[Dict]) -> List[Tuple[Dict, List[Dict]]]:
+    by_session: Dict[str, List[Dict]] = {str(s["_id"]): [] for s in sessions}
+    cursor = db["messages"].find(
+        {"session_id": {"$in": list(by_session)}},
+        EXPORT_MESSAGE_FIELDS,
+        sort=[("session_id", ASCENDING), ("timestamp", ASCENDING)],
+    )
+    async for msg in cursor:
+        by_session[msg.pop("session_id")].append(msg)
+    return [(s, by_session[str(s["_id"])]) for s in sessions]
+
+
+async def iter_export_batches(
+    db,
+    query: Dict[str, Any],
+    batch_size: int,
+) -> AsyncIterator[List[Tuple[Dict, List[Dict]]]]:
+    """
+    Newest-first (session, messages) pairs for every session matching
+    `query`, `batch_size` sessions at a time — one cursor over the sessions
+    and one $in query for each batch's messages, so only a batch is ever
+    held in memory.
+    """
+    cursor = db["sessions"].find(
+        query,
+        EXPORT_SESSION_FIELDS,
+        sort=[("created_at", DESCENDING), ("_id", DESCENDING)],
+        batch_size=batch_size,
+    )
+    batch: List[Dict] = []
+    async for session in cursor:
+        batch.append(session)
+        if len(batch) >= batch_size:
+            yield await _with_messages(db, batch)
+            batch = []
+    if batch:
+        yield await _with_messages(db, batch)
+
+
+# ─── Report re-scoring ────────────────────────────────────────────────────────
+
+def _rescore_query(filters: Dict[str, Any]) -> Dict[str, Any]:
+    query: Dict[str, Any] = {"status": "completed"}
+    if filters.get("user_id"):
+        query["user_id"] = filters["user_id"]
+    if filters.get("role"):
+        query["role"] = filters["role"]
+    if filters.get("only_fallback"):
+        query["report_fallback"] = True
+    elif not filters.get("include_unscored"):
+        query["overall_score"] = {"$ne": None}
+    created_at = {}
+    if filters.get("since"):
+        created_at["$gte"] = filters["since"]
+    if filters.get("until"):
+        created_at["$lt"] = filters["until"]
+    if created_at:
+        query["created_at"] = created_at
+    return query
+
+
+async def sessions_to_rescore(
+    db,
+    filters: Dict[str, Any],
+    after: Optional[Tuple[datetime, ObjectId]],
+    limit: int,
+) -> List[Dict]:
+    """Oldest-first page of completed sessions matching a re-scoring run's filters, keyset on (created_at, _id)."""
+    query = _rescore_query(filters)
+    if after:
+        created_at, last_id = after
+        query["$or"] = [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "_id": {"$gt": last_id}},
+        ]
+    cursor = db["sessions"].find(
+        query,
+        RESCORE_SESSION_FIELDS,
+        sort=[("created_at", ASCENDING), ("_id", ASCENDING)],
+        limit=limit,
+    )
+    return [doc async for doc in cursor]
+
+
+async def get_sessions_by_id(db, session_ids: List[str], projection: Dict) -> List[Dict]:
+    cursor = db["sessions"].find({"_id": {"$in": [ObjectId(sid) for sid in session_ids]}}, projection)
+    return [doc async for doc in cursor]
+
+
+async def get_rescore_run(db, run_id: str) -> Optional[Dict]:
+    return await db["rescore_runs"].find_one({"_id": run_id})
+
+
+async def insert_rescore_run(db, run_doc: Dict):
+    await db["rescore_runs"].insert_one(run_doc)
+
+
+async def checkpoint_rescore_run(
+    db,
+    run_id: str,
+    fields: Dict[str, Any],
+    counts: Dict[str, int],
+    failed: List[str],
+    recovered: List[str],
+):
+    """Record a finished batch: new cursor / status fields, count increments and failed session ids."""
+    update: Dict[str, Any] = {"$set": {**fields, "updated_at": datetime.utcnow()}}
+    if any(counts.values()):
+        update["$inc"] = {f"counts.{k}": v for k, v in counts.items() if v}
+    if failed:
+        update["$addToSet"] = {"failed_ids": {"$each": failed}}
+    await db["rescore_runs"].update_one({"_id": run_id}, update)
+    if recovered:
+        # $pull can't share an update with $addToSet on the same array
+        await db["rescore_runs"].update_one({"_id": run_id}, {"$pull": {"failed_ids": {"$in": recovered}}})
+
+
+async def run_report_versions(db, run_id: str, session_ids: List[str]) -> Dict[str, Dict]:
+    """This run's report_versions entries for these sessions, by session_id."""
+    cursor = db["report_versions"].find({"run_id": run_id, "session_id": {"$in": session_ids}})
+    return {doc["session_id"]: doc async for doc in cursor}
+
+
+async def next_report_version(db, session_id: str) -> int:
+    session = await db["sessions"].find_one_and_update(
+        {"_id": ObjectId(session_id)},
+        {"$inc": {"report_versions": 1}},
+        projection={"report_versions": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    return session["report_versions"]
+
+
+async def insert_report_version(db, version_doc: Dict):
+    await db["report_versions"].insert_one(version_doc)
+
+
+async def update_report_version(db, version_id, fields: Dict):
+    await db["report_versions"].update_one({"_id": version_id}, {"$set": fields})
+
+
+# ─── Feedback jobs ────────────────────────────────────────────────────────────
+
+async def upsert_feedback_job(db, session_id: str, user_id: str, transcript_hash: str) -> Dict:
+    """Return the job for this session + transcript, creating it as queued if new."""
+    now = datetime.utcnow()
+    return await db["feedback_jobs"].find_one_and_update(
+        {"session_id": session_id, "transcript_hash": transcript_hash},
+        {"$setOnInsert": {
+            "user_id": user_id,
+            "status": "queued",
+            "attempts": 0,
+            "error": None,
+            "lease_until": None,
+            "created_at": now,
+            "updated_at": now,
+        }},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def requeue_feedback_job(db, job_id) -> Optional[Dict]:
+    """Put a finished or failed job back in the queue."""
+    return await db["feedback_jobs"].find_one_and_update(
+        {"_id": job_id, "status": {"$in": ["done", "failed"]}},
+        {"$set": {"status": "queued", "error": None, "updated_at": datetime.utcnow()}},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def claim_feedback_job(db, job_id, lease_seconds: int) -> Optional[Dict]:
+    """Atomically move a queued (or abandoned running) job to running; None if someone else has it."""
+    now = datetime.utcnow()
+    return await db["feedback_jobs"].find_one_and_update(
+        {"_id": job_id, "$or": [
+            {"status": "queued"},
+            {"status": "running", "lease_until": {"$lt": now}},
+        ]},
+        {
+            "$set": {
+                "status": "running",
+                "lease_until": now + timedelta(seconds=lease_seconds),
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def update_feedback_job(db, job_id, fields: Dict):
+    await db["feedback_jobs"].update_one(
+        {"_id": job_id},
+        {"$set": {**fields, "updated_at": datetime.utcnow()}},
+    )
+
+
+async def get_feedback_job(db, job_id: str, user_id: str) -> Optional[Dict]:
+    return await db["feedback_jobs"].find_one({"_id": ObjectId(job_id), "user_id": user_id})
+
+
+async def latest_feedback_job(db, session_id: str) -> Optional[Dict]:
+    return await db["feedback_jobs"].find_one(
+        {"session_id": session_id},
+        sort=[("updated_at", DESCENDING)],
+    )
+
+
+async def pending_feedback_job_ids(db) -> List[ObjectId]:
+    """Jobs left queued, or running past their lease (e.g. after a crash)."""
+    cursor = db["feedback_jobs"].find(
+        {"$or": [
+            {"status": "queued"},
+            {"status": "running", "lease_until": {"$lt": datetime.utcnow()}},
+        ]},
+        {"_id": 1},
+        sort=[("created_at", ASCENDING)],
+    )
+    return [job["_id"] async for job in cursor]
+
+
+async def persist_turn(
+    db,
+    session_id: str,
+    user_msg_doc: Dict,
+    ai_msg_doc: Dict,
+    count_increment: int,
+    session_fields: Dict,
+    transactional: bool = False,
+    usage_event: Optional[Dict] = None,
+) -> int:
+    """
+    Write one interview turn and return the new question_count.
+
+    The scored answer and the AI reply go in a single ordered insert_many and
+    the session counter (plus usage totals) is bumped with $inc — issued
+    concurrently with the usage event insert, or as one transaction when
+    `transactional` is set.
+    """
+    increments = {"question_count": count_increment}
+    if usage_event:
+        increments.update(usage_increments(usage_event))
+    session_update = {"$inc": increments, "$set": session_fields}
+    messages = [user_msg_doc, ai_msg_doc]
+
+    if transactional:
+        async with await db.client.start_session() as s:
+            async with s.start_transaction():
+                await db["messages"].insert_many(messages, ordered=True, session=s)
+                session = await db["sessions"].find_one_and_update(
+                    {"_id": ObjectId(session_id)},
+                    session_update,
+                    projection={"question_count": 1},
+                    return_document=ReturnDocument.AFTER,
+                    session=s,
+                )
+                if usage_event:
+                    await db["llm_usage"].insert_one(usage_event, session=s)
+    else:
+        writes = [
+            db["messages"].insert_many(messages, ordered=True),
+            db["sessions"].find_one_and_update(
+                {"_id": ObjectId(session_id)},
+                session_update,
+                projection={"question_count": 1},
+                return_document=ReturnDocument.AFTER,
+            ),
+        ]
+        if usage_event:
+            writes.append(db["llm_usage"].insert_one(usage_event))
+        _, session, *_ = await asyncio.gather(*writes)
+    return session["question_count"]
+
+
+# ─── LLM usage ────────────────────────────────────────────────────────────────
+
+def usage_event(user_id: str, session_id: str, kind: str, usage: Dict[str, Any]) -> Dict[str, Any]:
+    """One `llm_usage` document: the accounting of a turn or report generation."""
+    return {**usage, "user_id": user_id, "session_id": session_id, "kind": kind, "created_at": datetime.utcnow()}
+
+
+def usage_increments(usage: Dict[str, Any]) -> Dict[str, Any]:
+    """$inc spec that adds one call's accounting to a session's usage_totals."""
+    return {
+        f"usage_totals.{key}": usage.get(key) or 0
+        for key in ("calls", "prompt_tokens", "completion_tokens", "cached_tokens", "wall_ms")
+    }
+
+
+async def record_usage(db, event: Dict[str, Any]):
+    await db["llm_usage"].insert_one(event)
+
+
+async def usage_by_day(db, user_id: str, since: datetime) -> List[Dict]:
+    """Per-day totals of a user's LLM calls since `since`, oldest day first."""
+    pipeline = [
+        {"$match": {"user_id": user_id, "created_at": {"$gte": since}}},
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+            "calls": {"$sum": "$calls"},
+            "turns": {"$sum": {"$cond": [{"$eq": ["$kind", "turn"]}, 1, 0]}},
+            "reports": {"$sum": {"$cond": [{"$eq": ["$kind", "feedback"]}, 1, 0]}},
+            "prompt_tokens": {"$sum": "$prompt_tokens"},
+            "completion_tokens": {"$sum": "$completion_tokens"},
+            "cached_tokens": {"$sum": "$cached_tokens"},
+            "wall_ms": {"$sum": "$wall_ms"},
+            "avg_ttft_ms": {"$avg": "$ttft_ms"},
+            "parse_failures": {"$sum": {"$cond": ["$parsed", 0, 1]}},
+        }},
+        {"$sort": {"_id": 1}},
+    ]
+    return [doc async for doc in db["llm_usage"].aggregate(pipeline)]
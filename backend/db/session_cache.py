@@ -0,0 +1,104 @@
+"""
+Per-process cache of live interview state for the turn hot path.
+
+Holds the session document and its ordered message history so a turn only
+appends to it instead of re-reading the transcript from MongoDB. Mongo stays
+the durable store: callers write there first and then mirror the change here
+(write-through). Entries expire after a TTL and the cache evicts least
+recently used sessions past an entry or memory cap; a miss simply rebuilds
+the entry from Mongo.
+"""
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "512"))
+SESSION_CACHE_TTL_SECONDS = int(os.getenv("SESSION_CACHE_TTL_SECONDS", "1800"))
+SESSION_CACHE_MAX_BYTES = int(os.getenv("SESSION_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+_MESSAGE_OVERHEAD = 200   # rough per-message cost of the dict itself
+
+
+def _message_size(msg: Dict) -> int:
+    return _MESSAGE_OVERHEAD + len(msg.get("content") or "")
+
+
+def _session_size(session: Dict) -> int:
+    return sum(len(v) for v in session.values() if isinstance(v, str)) + _MESSAGE_OVERHEAD
+
+
+class SessionState:
+    """Cached session document plus its messages, oldest first."""
+
+    __slots__ = ("session", "history", "size", "expires_at")
+
+    def __init__(self, session: Dict, history: List[Dict]):
+        self.session = session
+        self.history = history
+        self.size = _session_size(session) + sum(_message_size(m) for m in history)
+        self.expires_at = time.monotonic() + SESSION_CACHE_TTL_SECONDS
+
+
+class SessionCache:
+    def __init__(
+        self,
+        max_entries: int = SESSION_CACHE_MAX_ENTRIES,
+        max_bytes: int = SESSION_CACHE_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        state = self._entries.get(session_id)
+        if state is None:
+            return None
+        if state.expires_at < time.monotonic():
+            self.invalidate(session_id)
+            return None
+        self._entries.move_to_end(session_id)
+        return state
+
+    def put(self, session_id: str, session: Dict, history: List[Dict]) -> SessionState:
+        self.invalidate(session_id)
+        state = SessionState(session, history)
+        self._entries[session_id] = state
+        self._bytes += state.size
+        self._evict()
+        return state
+
+    def append(self, session_id: str, message: Dict):
+        state = self._entries.get(session_id)
+        if state is None:
+            return
+        state.history.append(message)
+        size = _message_size(message)
+        state.size += size
+        self._bytes += size
+        self._evict()
+
+    def update_session(self, session_id: str, fields: Dict):
+        state = self._entries.get(session_id)
+        if state is not None:
+            state.session.update(fields)
+
+    def invalidate(self, session_id: str):
+        state = self._entries.pop(session_id, None)
+        if state is not None:
+            self._bytes -= state.size
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, state = self._entries.popitem(last=False)
+            self._bytes -= state.size
+
+
+session_cache = SessionCache()
@@ -1,12 +1,19 @@
 import os
 import pathlib
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 from db.mongo import connect_db, close_db
-from routers import auth, sessions, interview, feedback
+from services.gemini import init_llm_client, close_llm_client, llm_router_stats
+from services.feedback_jobs import start_feedback_workers, stop_feedback_workers
+from services.pdf_parser import shutdown_pdf_pool
+from routers import auth, sessions, interview, feedback, usage, stats, export
+from utils.metrics import REQUEST_SECONDS, render_metrics
+from utils.responses import FastJSONResponse
 
 # Absolute-path load so uvicorn --reload always finds the key
 _ENV_PATH = pathlib.Path(__file__).parent / ".env"
@@ -21,9 +28,14 @@ ALLOWED_ORIGINS = list(set(filter(None, [
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Connect to MongoDB on startup, close on shutdown."""
+    """Connect to MongoDB and the LLM provider and start feedback workers on startup; undo on shutdown."""
     await connect_db()
+    await init_llm_client()
+    await start_feedback_workers()
     yield
+    await stop_feedback_workers()
+    shutdown_pdf_pool()
+    await close_llm_client()
     await close_db()
 
 
@@ -34,6 +46,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # CORS — allow Next.js frontend
@@ -43,13 +56,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After"],
 )
 
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    """Record time to response start per route template (not per raw path)."""
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    REQUEST_SECONDS.observe(
+        time.perf_counter() - started,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code,
+    )
+    return response
+
+
 # Register all routers
 app.include_router(auth.router)
 app.include_router(sessions.router)
 app.include_router(interview.router)
 app.include_router(feedback.router)
+app.include_router(usage.router)
+app.include_router(stats.router)
+app.include_router(export.router)
 
 
 @app.get("/", tags=["health"])
@@ -60,3 +93,15 @@ async def root():
 @app.get("/health", tags=["health"])
 async def health():
     return {"status": "healthy"}
+
+
+@app.get("/health/llm", tags=["health"])
+async def llm_health():
+    """Per-model circuit state, latency percentiles and routing decisions."""
+    return llm_router_stats()
+
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+async def metrics():
+    """Request and per-stage latency histograms, LLM routing outcomes and circuit states in Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,88 @@
+"""Schemas the LLM is asked to answer in, used to validate (and lightly coerce) its JSON."""
+import re
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List, Dict, Any
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _to_number(value: Any) -> Optional[float]:
+    """7, 7.5, "7", "7/10", "Score: 7" -> float; anything else -> None."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = _NUMBER.search(value)
+        return float(match.group()) if match else None
+    return None
+
+
+def _clamp(value: Optional[float], low: float, high: float) -> Optional[float]:
+    return None if value is None else max(low, min(high, value))
+
+
+def _to_str_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, list):
+        return [str(v) for v in value if v is not None and str(v).strip()]
+    return [str(value)]
+
+
+class InterviewTurn(BaseModel):
+    reply: str = Field(..., min_length=1)
+    score: Optional[float] = None          # 1-10, null on the opening turn
+    feedback: Optional[str] = None
+    weak_points: List[str] = []
+    is_follow_up: bool = False
+    interview_complete: bool = False
+
+    @field_validator("score", mode="before")
+    @classmethod
+    def _score(cls, v):
+        return _clamp(_to_number(v), 0, 10)
+
+    @field_validator("weak_points", mode="before")
+    @classmethod
+    def _weak_points(cls, v):
+        return _to_str_list(v)
+
+    @field_validator("is_follow_up", "interview_complete", mode="before")
+    @classmethod
+    def _flag(cls, v):
+        return False if v is None else v
+
+
+class FeedbackReport(BaseModel):
+    overall_score: float                    # 0-100
+    category_scores: Dict[str, float] = {}
+    strengths: List[str]
+    improvements: List[str] = []
+    summary: str = ""
+    recommendation: str = ""
+
+    @field_validator("overall_score", mode="before")
+    @classmethod
+    def _overall(cls, v):
+        return _clamp(_to_number(v), 0, 100)
+
+    @field_validator("category_scores", mode="before")
+    @classmethod
+    def _categories(cls, v):
+        if not isinstance(v, dict):
+            return {}
+        scores = {str(k): _clamp(_to_number(s), 0, 100) for k, s in v.items()}
+        return {k: s for k, s in scores.items() if s is not None}
+
+    @field_validator("strengths", "improvements", mode="before")
+    @classmethod
+    def _lists(cls, v):
+        return _to_str_list(v)
+
+    @field_validator("summary", "recommendation", mode="before")
+    @classmethod
+    def _text(cls, v):
+        return "" if v is None else str(v)
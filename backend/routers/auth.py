@@ -1,10 +1,13 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from datetime import datetime
+from typing import Optional
 from db.mongo import get_db
+from db import repository
 from models.user import UserCreate, UserLogin, UserOut, TokenOut
-from utils.auth import hash_password, verify_password, create_access_token, get_current_user
+from utils.auth import (
+    hash_password, verify_password, needs_rehash, create_access_token, get_current_user_profile, invalidate_user,
+)
 from utils.helpers import doc_to_dict
-from bson import ObjectId
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -14,18 +17,17 @@ async def register(data: UserCreate):
     db = get_db()
 
     # Check duplicate email
-    existing = await db["users"].find_one({"email": data.email})
+    existing = await repository.find_user_by_email(db, data.email, {"_id": 1})
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     user_doc = {
         "name": data.name,
         "email": data.email,
-        "hashed_password": hash_password(data.password),
+        "hashed_password": await hash_password(data.password),
         "created_at": datetime.utcnow(),
     }
-    result = await db["users"].insert_one(user_doc)
-    user_id = str(result.inserted_id)
+    user_id = await repository.insert_user(db, user_doc)
 
     token = create_access_token({"sub": user_id})
     user_out = UserOut(
@@ -41,10 +43,15 @@ async def register(data: UserCreate):
 async def login(data: UserLogin):
     db = get_db()
 
-    user = await db["users"].find_one({"email": data.email})
-    if not user or not verify_password(data.password, user["hashed_password"]):
+    user = await repository.find_user_by_email(db, data.email, repository.LOGIN_FIELDS)
+    if not user or not await verify_password(data.password, user["hashed_password"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
+    # Upgrade hashes made with an older work factor while we have the plaintext
+    if needs_rehash(user["hashed_password"]):
+        await repository.update_password_hash(db, user["_id"], await hash_password(data.password))
+        invalidate_user(str(user["_id"]))
+
     user_id = str(user["_id"])
     token = create_access_token({"sub": user_id})
     user_out = UserOut(
@@ -57,9 +64,7 @@ async def login(data: UserLogin):
 
 
 @router.get("/me", response_model=UserOut)
-async def get_me(user_id: str = Depends(get_current_user)):
-    db = get_db()
-    user = await db["users"].find_one({"_id": ObjectId(user_id)})
+async def get_me(user: Optional[dict] = Depends(get_current_user_profile)):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return UserOut(
@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from db.mongo import get_db
+from utils.auth import get_current_user, get_admin_user
+from services.export import EXPORT_FORMATS, export_sessions
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+def _export_response(query: dict, fmt: str, gzip: bool, name: str) -> StreamingResponse:
+    filename = f"{name}-{datetime.utcnow():%Y%m%d}.{fmt}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        export_sessions(get_db(), query, fmt, compress=gzip),
+        media_type="application/gzip" if gzip else EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Sessions store naive UTC timestamps; compare like with like."""
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+@router.get("/sessions")
+async def export_my_sessions(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    gzip: bool = Query(False),
+    user_id: str = Depends(get_current_user),
+):
+    """
+    Stream all of the current user's sessions with their reports and
+    transcripts, newest first. NDJSON has one session per line; CSV one row
+    per message. `gzip=true` compresses the download.
+    """
+    return _export_response({"user_id": user_id}, format, gzip, "interviewiq-sessions")
+
+
+@router.get("/admin/sessions")
+async def export_sessions_in_range(
+    start: datetime = Query(..., description="Sessions created at or after this time (UTC)"),
+    end: Optional[datetime] = Query(None, description="Sessions created before this time (UTC)"),
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    gzip: bool = Query(False),
+    admin: dict = Depends(get_admin_user),
+):
+    """Stream every user's sessions created in [start, end) — admins only (ADMIN_EMAILS)."""
+    start, end = _naive_utc(start), end and _naive_utc(end)
+    if end and end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    created_at = {"$gte": start}
+    if end:
+        created_at["$lt"] = end
+    return _export_response({"created_at": created_at}, format, gzip, "interviewiq-admin-sessions")
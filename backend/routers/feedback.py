@@ -1,85 +1,85 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends
-from bson import ObjectId
 from typing import List, Dict, Any
 
 from db.mongo import get_db
+from db import repository
 from utils.auth import get_current_user
-from services.gemini import generate_feedback_report
+from utils.rate_limit import limit_reports
+from utils.metrics import span
+from utils.responses import FastJSONResponse
+from utils.helpers import transcript_entry, transcript_hash
+from services.feedback_jobs import enqueue_feedback_job, job_status
 
 router = APIRouter(prefix="/feedback", tags=["feedback"])
 
 
+def _report_response(session_id: str, session: Dict[str, Any], transcript: List[Dict]) -> FastJSONResponse:
+    # Rendered straight from the stored documents — no jsonable_encoder walk over the transcript
+    return FastJSONResponse({
+        "session_id": session_id,
+        "role": session["role"],
+        "level": session["level"],
+        "rounds": session["rounds"],
+        "overall_score": session.get("overall_score"),
+        "category_scores": session.get("category_scores", {}),
+        "strengths": session.get("strengths", []),
+        "improvements": session.get("improvements", []),
+        "summary": session.get("summary", ""),
+        "recommendation": session.get("recommendation", ""),
+        "transcript": transcript,
+    })
+
+
+def _job_accepted(job: Dict[str, Any]) -> FastJSONResponse:
+    return FastJSONResponse(job_status(job), status_code=202)
+
+
 @router.post("/generate/{session_id}")
 async def generate_feedback(
     session_id: str,
-    user_id: str = Depends(get_current_user),
+    user_id: str = Depends(limit_reports),
 ):
     """
-    Generates the full AI feedback report for a completed session.
-    Saves scores to the session document.
+    Queues the full AI feedback report for a completed session and returns
+    202 with a job id; poll GET /feedback/{session_id} or /feedback/jobs/{job_id}.
+    A report already generated from the same transcript is returned as
+    stored (200), and repeated requests share one job.
     """
     db = get_db()
 
-    # Load session
-    session = await db["sessions"].find_one({
-        "_id": ObjectId(session_id),
-        "user_id": user_id,
-    })
+    # Load session and full transcript together
+    with span("feedback.load_transcript"):
+        session, messages = await asyncio.gather(
+            repository.get_session(db, session_id, user_id, repository.REPORT_FIELDS),
+            repository.list_messages(db, session_id),
+        )
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-
-    # Load full transcript
-    transcript = []
-    async for msg in db["messages"].find(
-        {"session_id": session_id},
-        sort=[("timestamp", 1)]
-    ):
-        transcript.append({
-            "role": msg["role"],
-            "content": msg["content"],
-            "score": msg.get("score"),
-            "feedback": msg.get("feedback"),
-            "weak_points": msg.get("weak_points", []),
-        })
+    transcript = [transcript_entry(msg) for msg in messages]
 
     if len(transcript) < 2:
         raise HTTPException(status_code=400, detail="Not enough transcript data to generate feedback")
 
-    # Generate feedback via Gemini
-    report = await generate_feedback_report(
-        role=session["role"],
-        level=session["level"],
-        rounds=session["rounds"],
-        transcript=transcript,
-    )
-
-    # Persist full report on the session
-    await db["sessions"].update_one(
-        {"_id": ObjectId(session_id)},
-        {"$set": {
-            "overall_score": report.get("overall_score"),
-            "category_scores": report.get("category_scores", {}),
-            "strengths": report.get("strengths", []),
-            "improvements": report.get("improvements", []),
-            "summary": report.get("summary", ""),
-            "recommendation": report.get("recommendation", ""),
-            "status": "completed",
-        }}
-    )
-
-    return {
-        "session_id": session_id,
-        "role": session["role"],
-        "level": session["level"],
-        "rounds": session["rounds"],
-        "overall_score": report.get("overall_score"),
-        "category_scores": report.get("category_scores"),
-        "strengths": report.get("strengths", []),
-        "improvements": report.get("improvements", []),
-        "summary": report.get("summary", ""),
-        "recommendation": report.get("recommendation", ""),
-        "transcript": transcript,
-    }
+    digest = transcript_hash(transcript)
+    if session.get("overall_score") is not None and session.get("report_hash") == digest:
+        return _report_response(session_id, session, transcript)
+
+    with span("feedback.enqueue"):
+        job = await enqueue_feedback_job(session_id, user_id, digest)
+    return _job_accepted(job)
+
+
+@router.get("/jobs/{job_id}")
+async def get_feedback_job(
+    job_id: str,
+    user_id: str = Depends(get_current_user),
+):
+    """Status of a queued feedback report: queued | running | done | failed."""
+    job = await repository.get_feedback_job(get_db(), job_id, user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return FastJSONResponse(job_status(job))
 
 
 @router.get("/{session_id}")
@@ -89,43 +89,26 @@ async def get_feedback(
 ):
     """
     Retrieve already-generated feedback for a completed session.
+    Returns 202 with the job status while a report is still being generated.
     """
     db = get_db()
 
-    session = await db["sessions"].find_one({
-        "_id": ObjectId(session_id),
-        "user_id": user_id,
-    })
+    # Load session, transcript and the latest job together
+    with span("feedback.load_transcript"):
+        session, messages, job = await asyncio.gather(
+            repository.get_session(db, session_id, user_id, repository.REPORT_FIELDS),
+            repository.list_messages(db, session_id),
+            repository.latest_feedback_job(db, session_id),
+        )
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    if not session.get("overall_score"):
+    # A stored report may be a fallback that is being regenerated — report the job until it finishes
+    has_report = session.get("overall_score") is not None
+    if job and (job["status"] in ("queued", "running") or (job["status"] == "failed" and not has_report)):
+        return _job_accepted(job)
+    if not has_report:
         raise HTTPException(status_code=400, detail="Feedback not yet generated. Call POST /feedback/generate first.")
 
-    # Load transcript
-    transcript = []
-    async for msg in db["messages"].find(
-        {"session_id": session_id},
-        sort=[("timestamp", 1)]
-    ):
-        transcript.append({
-            "role": msg["role"],
-            "content": msg["content"],
-            "score": msg.get("score"),
-            "feedback": msg.get("feedback"),
-            "weak_points": msg.get("weak_points", []),
-        })
-
-    return {
-        "session_id": session_id,
-        "role": session["role"],
-        "level": session["level"],
-        "rounds": session["rounds"],
-        "overall_score": session.get("overall_score"),
-        "category_scores": session.get("category_scores", {}),
-        "strengths": session.get("strengths", []),
-        "improvements": session.get("improvements", []),
-        "summary": session.get("summary", ""),
-        "recommendation": session.get("recommendation", ""),
-        "transcript": transcript,
-    }
+    transcript = [transcript_entry(msg) for msg in messages]
+    return _report_response(session_id, session, transcript)
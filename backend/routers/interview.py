@@ -1,34 +1,60 @@
+import asyncio
+import json
 from fastapi import APIRouter, HTTPException, Depends, Body
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 from bson import ObjectId
 from typing import Optional
 
-from db.mongo import get_db
-from models.message import MessageIn, MessageOut, AITurnOut
+from db.mongo import get_db, use_transactions
+from db import repository
+from db.session_cache import session_cache, SessionState
+from models.message import MessageIn, AITurnOut
 from utils.auth import get_current_user
-from services.gemini import get_next_interview_turn
+from utils.rate_limit import limit_turns
+from utils.metrics import span
+from utils.responses import FastJSONResponse, dumps
+from services.gemini import get_next_interview_turn, stream_next_interview_turn
+from services.openings import is_opening, cached_opening, remember_opening
 
 router = APIRouter(prefix="/interview", tags=["interview"])
 
 
-@router.post("/message", response_model=AITurnOut)
-async def send_message(
-    data: MessageIn,
-    user_id: str = Depends(get_current_user),
-):
-    db = get_db()
+def _history_entry(msg: dict) -> dict:
+    return {"_id": msg["_id"], "role": msg["role"], "content": msg["content"], "score": msg.get("score")}
 
-    # Verify session belongs to user
-    session = await db["sessions"].find_one({
-        "_id": ObjectId(data.session_id),
-        "user_id": user_id,
-        "status": "active",
-    })
+
+async def _load_active_session(db, session_id: str, user_id: str) -> SessionState:
+    """Return the cached session state, rebuilding it from Mongo on a miss."""
+    state = session_cache.get(session_id)
+    if state and state.session["user_id"] == user_id and state.session["status"] == "active":
+        return state
+
+    session = await repository.get_session(
+        db, session_id, user_id, repository.TURN_SESSION_FIELDS, status="active",
+    )
     if not session:
         raise HTTPException(status_code=404, detail="Active session not found")
 
-    # Persist user message — store _id for score update later
+    # Sessions reference shared resume text by hash; older ones still embed it
+    history_lookup = repository.list_messages(db, session_id, repository.HISTORY_FIELDS)
+    if session.get("resume_id"):
+        messages, session["resume_text"] = await asyncio.gather(
+            history_lookup,
+            repository.get_resume_text(db, session["resume_id"]),
+        )
+    else:
+        messages = await history_lookup
+    history = [_history_entry(msg) for msg in messages]
+    return session_cache.put(session_id, session, history)
+
+
+def _start_turn(data: MessageIn, state: SessionState):
+    """Build the user's message and return (user_msg_doc, history not yet folded into the summary)."""
+    # Written together with the AI reply once the turn is scored — see db.repository.persist_turn.
+    # Nothing is saved if the LLM call fails; the interview page keeps the answer for a retry.
     user_msg_doc = {
+        "_id": ObjectId(),
         "session_id": data.session_id,
         "role": "user",
         "content": data.content,
@@ -37,62 +63,82 @@ async def send_message(
         "weak_points": [],
         "timestamp": datetime.utcnow(),
     }
-    user_insert = await db["messages"].insert_one(user_msg_doc)
-    user_msg_id = user_insert.inserted_id
 
-    # Fetch full conversation history (for Gemini context)
-    history_cursor = db["messages"].find(
-        {"session_id": data.session_id},
-        sort=[("timestamp", 1)]
-    )
-    history = []
-    async for msg in history_cursor:
-        history.append({"role": msg["role"], "content": msg["content"]})
+    # Only the history the rolling summary doesn't cover yet goes to Gemini
+    history = state.history[state.session.get("context_summarized", 0):]
+    return user_msg_doc, history + [_history_entry(user_msg_doc)]
+
 
-    # Call Gemini AI
-    question_count = session.get("question_count", 0)
-    ai_result = await get_next_interview_turn(
+def _turn_kwargs(session: dict, history: list) -> dict:
+    return dict(
         role=session["role"],
         level=session["level"],
         current_round=session.get("current_round", session["rounds"][0]),
         resume_text=session.get("resume_text", ""),
         job_description=session.get("job_description", ""),
         history=history,
-        question_count=question_count,
+        question_count=session.get("question_count", 0),
+        context_summary=session.get("context_summary", ""),
+        context_summarized=session.get("context_summarized", 0),
     )
 
-    # Update score on the user's message by _id (no invalid sort param)
-    await db["messages"].update_one(
-        {"_id": user_msg_id},
-        {"$set": {
-            "score": ai_result.get("score"),
-            "feedback": ai_result.get("feedback"),
-            "weak_points": ai_result.get("weak_points", []),
-        }}
-    )
 
-    # Persist AI reply
+async def _finish_turn(db, data: MessageIn, state: SessionState, user_msg_doc: dict, ai_result: dict) -> dict:
+    """Write the scored answer and the AI reply (Mongo first, then the cache) and build the AITurnOut body."""
+    session = state.session
+    user_msg_doc.update({
+        "score": ai_result.get("score"),
+        "feedback": ai_result.get("feedback"),
+        "weak_points": ai_result.get("weak_points", []),
+    })
     ai_msg_doc = {
+        "_id": ObjectId(),
         "session_id": data.session_id,
         "role": "ai",
         "content": ai_result["reply"],
+        "usage": ai_result.get("usage"),   # tokens, timings, model and parse success of this call
         "timestamp": datetime.utcnow(),
     }
-    ai_result_id = await db["messages"].insert_one(ai_msg_doc)
 
-    # Increment question count (only if not a follow-up)
-    new_count = question_count + (0 if ai_result.get("is_follow_up") else 1)
-    await db["sessions"].update_one(
-        {"_id": ObjectId(data.session_id)},
-        {"$set": {"question_count": new_count}}
-    )
+    # Increment question count (only if not a follow-up) and save the rolling summary
+    context = ai_result.get("context", {})
+    session_fields = {
+        "context_summary": context.get("summary", session.get("context_summary", "")),
+        "context_summarized": context.get("summarized", session.get("context_summarized", 0)),
+    }
 
-    return AITurnOut(
-        message=MessageOut(
-            id=str(ai_result_id.inserted_id),
+    try:
+        with span("interview.persist"):
+            new_count = await repository.persist_turn(
+                db,
+                data.session_id,
+                user_msg_doc,
+                ai_msg_doc,
+                count_increment=0 if ai_result.get("is_follow_up") else 1,
+                session_fields=session_fields,
+                transactional=use_transactions(),
+                usage_event=repository.usage_event(
+                    session["user_id"], data.session_id, "turn", ai_result["usage"],
+                ) if ai_result.get("usage") else None,
+            )
+    except Exception:
+        session_cache.invalidate(data.session_id)
+        raise
+
+    session_cache.append(data.session_id, _history_entry(user_msg_doc))
+    session_cache.append(data.session_id, _history_entry(ai_msg_doc))
+    session_cache.update_session(data.session_id, {**session_fields, "question_count": new_count})
+
+    # Already validated by the LLM parser or written by us, so not run through pydantic again
+    return dict(
+        message=dict(
+            id=str(ai_msg_doc["_id"]),
             session_id=data.session_id,
             role="ai",
             content=ai_result["reply"],
+            score=None,
+            feedback=None,
+            weak_points=None,
             timestamp=ai_msg_doc["timestamp"],
         ),
         score=ai_result.get("score"),
@@ -103,21 +149,111 @@ async def send_message(
     )
 
 
+@router.post("/message", response_model=AITurnOut)
+async def send_message(
+    data: MessageIn,
+    user_id: str = Depends(limit_turns),
+):
+    db = get_db()
+
+    # Verify session belongs to user
+    with span("interview.load_session"):
+        state = await _load_active_session(db, data.session_id, user_id)
+    with span("interview.history"):
+        user_msg_doc, history = _start_turn(data, state)
+
+    # Serve a pooled opening turn when there is one, otherwise call Gemini AI
+    opening = is_opening(state.session, state.history)
+    if opening:
+        with span("interview.opening_cache"):
+            ai_result = await cached_opening(db, state.session)
+    else:
+        ai_result = None
+    if ai_result is None:
+        ai_result = await get_next_interview_turn(**_turn_kwargs(state.session, history))
+        if opening:
+            await remember_opening(db, state.session, ai_result)
+
+    return FastJSONResponse(await _finish_turn(db, data, state, user_msg_doc, ai_result))
+
+
+def _sse(event: str, payload: str) -> str:
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def _event_json(payload) -> str:
+    try:
+        return dumps(payload).decode("utf-8")
+    except TypeError:
+        # orjson rejects lone surrogates; json escapes them and the client's parser copes
+        return json.dumps(payload, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v))
+
+
+@router.post("/message/stream")
+async def send_message_stream(
+    data: MessageIn,
+    user_id: str = Depends(limit_turns),
+):
+    """
+    Same turn as POST /interview/message, delivered as Server-Sent Events.
+    Emits `token` events with reply text as it is generated, then one `turn`
+    event carrying the full AITurnOut once the turn has been saved.
+    """
+    db = get_db()
+
+    # Validate the session before the stream opens so errors are real HTTP errors
+    with span("interview.load_session"):
+        state = await _load_active_session(db, data.session_id, user_id)
+    with span("interview.history"):
+        user_msg_doc, history = _start_turn(data, state)
+    opening = is_opening(state.session, state.history)
+
+    async def event_stream():
+        ai_result = None
+        try:
+            if opening:
+                with span("interview.opening_cache"):
+                    ai_result = await cached_opening(db, state.session)
+            if ai_result is not None:
+                yield _sse("token", _event_json({"delta": ai_result["reply"]}))
+            else:
+                async for event in stream_next_interview_turn(**_turn_kwargs(state.session, history)):
+                    if event["type"] == "token":
+                        yield _sse("token", _event_json({"delta": event["delta"]}))
+                    else:
+                        ai_result = event["data"]
+                if opening:
+                    await remember_opening(db, state.session, ai_result)
+        except Exception as e:
+            print(f"Streaming turn error: {e}")
+            if ai_result is None:
+                yield _sse("error", _event_json({"detail": "AI response failed, please retry"}))
+                return
+
+        # A generated (and billed) turn is saved even if streaming part of it failed
+        try:
+            turn = await _finish_turn(db, data, state, user_msg_doc, ai_result)
+        except Exception as e:
+            print(f"Streaming turn save error: {e}")
+            yield _sse("error", _event_json({"detail": "AI response failed, please retry"}))
+            return
+        yield _sse("turn", _event_json(turn))
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/end/{session_id}")
 async def end_session(
     session_id: str,
     user_id: str = Depends(get_current_user),
 ):
     db = get_db()
-    session = await db["sessions"].find_one({
-        "_id": ObjectId(session_id),
-        "user_id": user_id,
-    })
-    if not session:
+    if not await repository.complete_session(db, session_id, user_id):
         raise HTTPException(status_code=404, detail="Session not found")
 
-    await db["sessions"].update_one(
-        {"_id": ObjectId(session_id)},
-        {"$set": {"status": "completed", "completed_at": datetime.utcnow()}}
-    )
+    session_cache.invalidate(session_id)
     return {"message": "Session ended", "session_id": session_id}
@@ -1,16 +1,34 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+import hashlib
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Query
 from typing import List, Optional
 from datetime import datetime
-from bson import ObjectId
 
 from db.mongo import get_db
+from db import repository
 from models.session import SessionOut, SessionListItem, SessionStatus
 from utils.auth import get_current_user
-from services.pdf_parser import extract_text_from_pdf
+from services.pdf_parser import read_pdf_upload, extract_text
+from utils.helpers import encode_cursor, decode_cursor
+from utils.metrics import span
+from utils.responses import FastJSONResponse
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
 
+async def _resolve_resume(db, resume: UploadFile) -> Optional[str]:
+    """Return the resume_id for an uploaded PDF, parsing it only the first time it's seen."""
+    content = await read_pdf_upload(resume)
+    resume_id = hashlib.sha256(content).hexdigest()
+    if await repository.get_resume_text(db, resume_id) is not None:
+        return resume_id
+
+    resume_text = await extract_text(content)
+    if not resume_text:
+        return None     # don't cache failed or timed-out extractions
+    await repository.save_resume(db, resume_id, resume_text)
+    return resume_id
+
+
 @router.post("/start", response_model=SessionOut, status_code=201)
 async def start_session(
     role: str = Form(...),
@@ -22,12 +40,13 @@ async def start_session(
 ):
     db = get_db()
 
-    # Parse resume PDF if provided
-    resume_text = ""
+    # Parse resume PDF if provided (or reuse the text from an identical earlier upload)
+    resume_id = None
     if resume and resume.filename:
         if not resume.filename.endswith(".pdf"):
             raise HTTPException(status_code=400, detail="Resume must be a PDF file")
-        resume_text = await extract_text_from_pdf(resume)
+        with span("sessions.resume"):
+            resume_id = await _resolve_resume(db, resume)
 
     rounds_list = [r.strip() for r in rounds.split(",") if r.strip()]
 
@@ -36,7 +55,7 @@ async def start_session(
         "role": role,
         "level": level,
         "rounds": rounds_list,
-        "resume_text": resume_text,
+        "resume_id": resume_id,
         "job_description": job_description,
         "status": SessionStatus.active,
         "current_round": rounds_list[0] if rounds_list else "general",
@@ -46,31 +65,57 @@ async def start_session(
         "overall_score": None,
         "category_scores": None,
     }
-    result = await db["sessions"].insert_one(session_doc)
+    with span("sessions.insert"):
+        session_id = await repository.insert_session(db, session_doc)
 
-    return SessionOut(
-        id=str(result.inserted_id),
+    return FastJSONResponse(dict(   # SessionOut
+        id=session_id,
         user_id=user_id,
         role=role,
         level=level,
         rounds=rounds_list,
         status=SessionStatus.active,
         created_at=session_doc["created_at"],
+        completed_at=None,
+        overall_score=None,
+        category_scores=None,
         question_count=0,
-    )
+    ), status_code=201)
 
 
 @router.get("", response_model=List[SessionListItem])
-async def list_sessions(user_id: str = Depends(get_current_user)):
+async def list_sessions(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    status: Optional[SessionStatus] = None,
+    role: Optional[str] = None,
+    user_id: str = Depends(get_current_user),
+):
+    """
+    Newest sessions first, `limit` per page. When more remain, the token for
+    the next page is returned in the X-Next-Cursor header.
+    """
+    after = None
+    if cursor:
+        after = decode_cursor(cursor)
+        if after is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
     db = get_db()
-    cursor = db["sessions"].find(
-        {"user_id": user_id},
-        sort=[("created_at", -1)],
-        limit=20
-    )
+    with span("sessions.list"):
+        # One extra row tells us whether there is a next page
+        docs = await repository.list_sessions(
+            db, user_id, limit + 1, after, status.value if status else None, role,
+        )
+    headers = {}
+    if len(docs) > limit:
+        docs = docs[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(docs[-1]["created_at"], docs[-1]["_id"])
+
+    # Our own documents: rendered as SessionListItem-shaped dicts, not validated again
     sessions = []
-    async for doc in cursor:
-        sessions.append(SessionListItem(
+    for doc in docs:
+        sessions.append(dict(
             id=str(doc["_id"]),
             role=doc["role"],
             level=doc["level"],
@@ -80,17 +125,17 @@ async def list_sessions(user_id: str = Depends(get_current_user)):
             overall_score=doc.get("overall_score"),
             question_count=doc.get("question_count", 0),
         ))
-    return sessions
+    return FastJSONResponse(sessions, headers=headers)
 
 
 @router.get("/{session_id}", response_model=SessionOut)
 async def get_session(session_id: str, user_id: str = Depends(get_current_user)):
     db = get_db()
-    doc = await db["sessions"].find_one({"_id": ObjectId(session_id), "user_id": user_id})
+    doc = await repository.get_session(db, session_id, user_id, repository.SESSION_OUT_FIELDS)
     if not doc:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    return SessionOut(
+    return FastJSONResponse(dict(   # SessionOut
         id=str(doc["_id"]),
         user_id=doc["user_id"],
         role=doc["role"],
@@ -102,4 +147,4 @@ async def get_session(session_id: str, user_id: str = Depends(get_current_user))
         overall_score=doc.get("overall_score"),
         category_scores=doc.get("category_scores"),
         question_count=doc.get("question_count", 0),
-    )
+    ))
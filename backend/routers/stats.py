@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+
+from db.mongo import get_db
+from db import repository
+from utils.auth import get_current_user
+from utils.responses import FastJSONResponse
+from services.user_stats import stats_view
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("")
+async def get_stats(user_id: str = Depends(get_current_user)):
+    """Progress across all of the current user's reports — one read of their user_stats document."""
+    return FastJSONResponse(stats_view(await repository.get_user_stats(get_db(), user_id)))
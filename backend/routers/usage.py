@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Query
+
+from db.mongo import get_db
+from db import repository
+from utils.auth import get_current_user
+from utils.responses import FastJSONResponse
+
+router = APIRouter(prefix="/usage", tags=["usage"])
+
+
+@router.get("")
+async def get_usage(
+    days: int = Query(30, ge=1, le=365),
+    user_id: str = Depends(get_current_user),
+):
+    """Token spend and LLM latency for the current user, per day over the last `days` days."""
+    since = datetime.utcnow() - timedelta(days=days)
+    by_day = await repository.usage_by_day(get_db(), user_id, since)
+
+    totals = {
+        key: sum(day[key] for day in by_day)
+        for key in ("calls", "turns", "reports", "prompt_tokens", "completion_tokens",
+                    "cached_tokens", "wall_ms", "parse_failures")
+    }
+    return FastJSONResponse({
+        "since": since,
+        "totals": totals,
+        "by_day": [{"date": day.pop("_id"), **day} for day in by_day],
+    })
@@ -0,0 +1,39 @@
+"""
+Drop indexes that newer compound indexes have made redundant.
+
+ensure_indexes only creates indexes at startup; removing the old prefixes is
+a one-off migration, run once per deployment after the new indexes exist:
+
+    python -m scripts.drop_redundant_indexes --check
+    python -m scripts.drop_redundant_indexes
+"""
+import argparse
+import asyncio
+
+from db import mongo
+from db import repository
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="list the indexes without dropping them")
+    args = parser.parse_args()
+
+    await mongo.connect_db()
+    db = mongo.get_db()
+    try:
+        await repository.ensure_indexes(db)     # never drop a prefix before its replacement exists
+        found = await repository.redundant_indexes(db)
+        for collection, name in found:
+            if args.check:
+                print(f"{collection}.{name} is redundant")
+            else:
+                await repository.drop_index(db, collection, name)
+                print(f"🗑️  Dropped {collection}.{name}")
+        print(f"✅ {len(found)} redundant indexes {'found' if args.check else 'dropped'}")
+    finally:
+        await mongo.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
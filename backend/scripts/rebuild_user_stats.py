@@ -0,0 +1,82 @@
+"""
+Recompute user_stats documents from the sessions and their transcripts.
+
+The incremental updates in services.user_stats can drift if a process dies
+between saving a report and applying its stats. This rebuilds each user's
+document from scratch (and refreshes every session's stored contribution);
+with --check it only reports users whose stored stats differ:
+
+    python -m scripts.rebuild_user_stats --check
+    python -m scripts.rebuild_user_stats --user <user_id>
+"""
+import argparse
+import asyncio
+
+from db import mongo
+from db import repository
+from services.user_stats import report_contribution, stats_document
+from utils.helpers import transcript_entry
+
+_COMPARED = ("sessions_scored", "score_sum", "best_score", "last_score")
+
+
+def _drift(stored: dict, rebuilt: dict) -> list:
+    stored = stored or {}
+    diffs = []
+    for key in _COMPARED:
+        a, b = stored.get(key), rebuilt.get(key)
+        if (a is None) != (b is None) or (a is not None and abs(a - b) > 1e-6):
+            diffs.append(f"{key}: {a} != {b}")
+    for section in ("categories", "roles"):
+        for name, values in rebuilt.get(section, {}).items():
+            have = (stored.get(section) or {}).get(name, {})
+            if abs(have.get("count", 0) - values.get("count", 0)) > 1e-6:
+                diffs.append(f"{section}.{name}.count: {have.get('count', 0)} != {values.get('count', 0)}")
+    stored_points = {k: v for k, v in (stored.get("weak_points") or {}).items() if v}
+    if stored_points != rebuilt.get("weak_points", {}):
+        diffs.append("weak_points differ")
+    return diffs
+
+
+async def rebuild_user(db, user_id: str, check: bool) -> bool:
+    """Returns True if the stored stats had drifted."""
+    contributions = []
+    for session in await repository.scored_sessions(db, user_id):
+        session_id = str(session["_id"])
+        transcript = [transcript_entry(m) for m in await repository.list_messages(db, session_id)]
+        contribution = report_contribution(session, session, transcript)
+        if contribution is None:
+            continue
+        contributions.append((session_id, contribution))
+        if not check:
+            await repository.set_stats_contribution(db, session_id, contribution)
+
+    contributions.sort(key=lambda item: item[1]["at"])
+    rebuilt = stats_document(contributions)
+    diffs = _drift(await repository.get_user_stats(db, user_id), rebuilt)
+    if diffs:
+        print(f"{user_id}: " + "; ".join(diffs))
+    if not check:
+        await repository.replace_user_stats(db, user_id, rebuilt)
+    return bool(diffs)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="only this user_id (default: every user with a report)")
+    parser.add_argument("--check", action="store_true", help="report drift without writing")
+    args = parser.parse_args()
+
+    await mongo.connect_db()
+    db = mongo.get_db()
+    user_ids = [args.user] if args.user else await repository.user_ids_with_reports(db)
+    drifted = 0
+    for user_id in user_ids:
+        drifted += await rebuild_user(db, user_id, args.check)
+    action = "checked" if args.check else "rebuilt"
+    print(f"✅ {action} stats for {len(user_ids)} users, {drifted} had drifted")
+    await mongo.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
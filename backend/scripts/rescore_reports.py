@@ -0,0 +1,282 @@
+"""
+Regenerate feedback reports for completed sessions in bulk, e.g. after a
+change to the feedback prompt or model.
+
+Sessions matching the filters are walked oldest first in batches, and each
+batch is re-scored with bounded concurrency under a shared rate limit. A
+fallback report (provider errors, open breakers) makes the run back off.
+Every new report is stored as a numbered version in `report_versions`; the
+report it replaces is archived as a version the first time. The new report
+then becomes the session's current one, with stats and usage updated, unless
+--no-promote is given.
+
+Progress is checkpointed per batch in `rescore_runs`. Running again with the
+same --run-id resumes where it stopped and reuses the run's stored filters.
+Each session's version for the run is reserved before the LLM call and
+marked pending once its report is stored, then done once promoted. A crash
+mid-batch therefore resumes each session at the step it reached: a stored
+report is never generated again, and a promoted one is never promoted twice.
+--per-minute paces report generations (sessions), not raw LLM calls. A
+generation can make up to 3 calls when the model's output fails to parse.
+Set LLM_MODELS for this process to re-score with a different model than
+live traffic uses.
+
+    python -m scripts.rescore_reports --label prompt-v4 --since 2026-01-01 --per-minute 30
+    python -m scripts.rescore_reports --run-id rescore-20261018-120000
+    python -m scripts.rescore_reports --run-id rescore-20261018-120000 --retry-failed
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from db import mongo
+from db import repository
+from services.gemini import LLM_MODELS, init_llm_client, close_llm_client, generate_feedback_report
+from services.feedback_jobs import save_generated_report
+from utils.helpers import transcript_entry, transcript_hash
+from utils.rate_limit import MemoryRateLimitBackend
+
+_MAX_BACKOFF_SECONDS = 300
+
+
+class _Pacer:
+    """Shared token bucket for report generations, plus an exponential pause while they keep falling back."""
+
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60
+        self.burst = burst
+        self._bucket = MemoryRateLimitBackend()
+        self._paused_until = 0.0
+        self._backoff = 0.0
+
+    async def wait(self):
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            wait = await self._bucket.take("rescore", self.rate, self.burst)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def failed(self):
+        self._backoff = min(_MAX_BACKOFF_SECONDS, self._backoff * 2 or 5)
+        self._paused_until = max(self._paused_until, time.monotonic() + self._backoff)
+        print(f"⚠️  Report generation failing, pausing {self._backoff:.0f}s")
+
+    def succeeded(self):
+        self._backoff = 0.0
+
+
+def _version_doc(session: Dict, version: int, report: Dict, run: Optional[Dict], digest: Optional[str]) -> Dict:
+    return {
+        "session_id": str(session["_id"]),
+        "user_id": session["user_id"],
+        "version": version,
+        "run_id": run["_id"] if run else None,
+        "label": run["label"] if run else "original",
+        "status": "done",
+        "overall_score": report.get("overall_score"),
+        "category_scores": report.get("category_scores", {}),
+        "strengths": report.get("strengths", []),
+        "improvements": report.get("improvements", []),
+        "summary": report.get("summary", ""),
+        "recommendation": report.get("recommendation", ""),
+        "usage": report.get("usage"),
+        "transcript_hash": digest,
+        "promoted": bool(run and run["promote"]),
+        "created_at": datetime.utcnow(),
+    }
+
+
+async def _archive_current(db, session: Dict):
+    """Keep the report a session had before its first re-score as a version of its own."""
+    if session.get("report_versions") or session.get("overall_score") is None:
+        return
+    version = await repository.next_report_version(db, str(session["_id"]))
+    await repository.insert_report_version(
+        db, _version_doc(session, version, session, None, session.get("report_hash")),
+    )
+
+
+async def _target_version(db, run: Dict, session: Dict) -> Dict:
+    """Reserve this run's version number for the session, before any LLM call is made."""
+    await _archive_current(db, session)
+    version = await repository.next_report_version(db, str(session["_id"]))
+    doc = {**_version_doc(session, version, {}, run, None), "status": "generating"}
+    await repository.insert_report_version(db, doc)
+    return doc
+
+
+async def rescore_session(db, run: Dict, session: Dict, pacer: _Pacer, target: Optional[Dict] = None) -> str:
+    """
+    Re-score one session; returns "rescored", "failed" or "skipped".
+
+    The session's version for this run moves generating → pending (report
+    stored) → done (promoted if the run promotes). Resuming from
+    `target` picks up at that step, so a stored report is never generated
+    again and a promoted one never promoted twice.
+    """
+    session_id = str(session["_id"])
+    transcript = [transcript_entry(m) for m in await repository.list_messages(db, session_id)]
+    if len(transcript) < 2:
+        return "skipped"
+
+    if target is None or target["status"] == "generating":
+        await pacer.wait()
+        target = target or await _target_version(db, run, session)
+        report = await generate_feedback_report(
+            role=session["role"],
+            level=session["level"],
+            rounds=session["rounds"],
+            transcript=transcript,
+        )
+        if report.get("is_fallback"):
+            pacer.failed()
+            return "failed"     # the reserved version is reused on retry
+        pacer.succeeded()
+        target = {
+            **target, **_version_doc(session, target["version"], report, run, transcript_hash(transcript)),
+            "status": "pending",
+        }
+        await repository.update_report_version(db, target["_id"], {k: v for k, v in target.items() if k != "_id"})
+
+    version = target["version"]
+    if run["promote"] and session.get("report_version") != version:
+        await save_generated_report(db, session["user_id"], session_id, session, target, transcript, version)
+    await repository.update_report_version(db, target["_id"], {"status": "done"})
+    return "rescored"
+
+
+async def _rescore_batch(db, run: Dict, sessions: List[Dict], pacer: _Pacer, concurrency: asyncio.Semaphore):
+    """Re-score the sessions of a batch this run hasn't finished; returns (counts, failed ids, succeeded ids)."""
+    versions = await repository.run_report_versions(db, run["_id"], [str(s["_id"]) for s in sessions])
+    todo = [s for s in sessions if versions.get(str(s["_id"]), {}).get("status") != "done"]
+
+    async def guarded(session):
+        async with concurrency:
+            try:
+                return await rescore_session(db, run, session, pacer, versions.get(str(session["_id"])))
+            except Exception as e:
+                print(f"Re-scoring {session['_id']} failed: {e}")
+                return "failed"
+
+    results = await asyncio.gather(*[guarded(s) for s in todo])
+    counts = {"rescored": 0, "failed": 0, "skipped": 0}
+    for result in results:
+        counts[result] += 1
+    failed = [str(s["_id"]) for s, r in zip(todo, results) if r == "failed"]
+    recovered = [str(s["_id"]) for s, r in zip(todo, results) if r == "rescored"]
+    return counts, failed, recovered
+
+
+def _filters(args) -> Dict[str, Any]:
+    return {
+        "user_id": args.user,
+        "role": args.role,
+        "since": datetime.fromisoformat(args.since) if args.since else None,
+        "until": datetime.fromisoformat(args.until) if args.until else None,
+        "only_fallback": args.only_fallback,
+        "include_unscored": args.include_unscored,
+    }
+
+
+async def _load_run(db, args) -> Dict:
+    run = await repository.get_rescore_run(db, args.run_id)
+    if run:
+        print(f"↩️  Resuming {run['_id']} ({run['label']}): {run.get('counts', {})}")
+        return run
+    run = {
+        "_id": args.run_id,
+        "label": args.label or ",".join(LLM_MODELS),
+        "filters": _filters(args),
+        "promote": not args.no_promote,
+        "status": "running",
+        "after": None,
+        "counts": {"rescored": 0, "failed": 0, "skipped": 0},
+        "failed_ids": [],
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }
+    await repository.insert_rescore_run(db, run)
+    print(f"🆕 Started {run['_id']} ({run['label']})")
+    return run
+
+
+async def run_rescore(db, args) -> Dict:
+    run = await _load_run(db, args)
+    pacer = _Pacer(args.per_minute, burst=args.concurrency)
+    concurrency = asyncio.Semaphore(args.concurrency)
+    processed = 0
+
+    if args.retry_failed:
+        # Retries don't move the cursor; the failed list shrinks as sessions succeed
+        for start in range(0, len(run.get("failed_ids", [])), args.batch_size):
+            ids = run["failed_ids"][start:start + args.batch_size]
+            sessions = await repository.get_sessions_by_id(db, ids, repository.RESCORE_SESSION_FIELDS)
+            counts, failed, recovered = await _rescore_batch(db, run, sessions, pacer, concurrency)
+            # counts.failed tracks sessions still failing, so recoveries come off it
+            retried = {"rescored": counts["rescored"], "skipped": counts["skipped"], "failed": -len(recovered)}
+            await repository.checkpoint_rescore_run(db, run["_id"], {}, retried, [], recovered)
+            print(f"🔁 retried {len(sessions)}: {counts}")
+        return await repository.get_rescore_run(db, run["_id"])
+
+    after = (run["after"]["created_at"], run["after"]["_id"]) if run.get("after") else None
+    while args.limit is None or processed < args.limit:
+        size = args.batch_size if args.limit is None else min(args.batch_size, args.limit - processed)
+        sessions = await repository.sessions_to_rescore(db, run["filters"], after, size)
+        if not sessions:
+            await repository.checkpoint_rescore_run(
+                db, run["_id"], {"status": "done", "finished_at": datetime.utcnow()}, {}, [], [],
+            )
+            break
+        counts, failed, recovered = await _rescore_batch(db, run, sessions, pacer, concurrency)
+        last = sessions[-1]
+        after = (last["created_at"], last["_id"])
+        await repository.checkpoint_rescore_run(
+            db, run["_id"], {"after": {"created_at": last["created_at"], "_id": last["_id"]}},
+            counts, failed, recovered,
+        )
+        processed += len(sessions)
+        print(f"📦 {processed} sessions walked, last batch: {counts}")
+    return await repository.get_rescore_run(db, run["_id"])
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--run-id", default=f"rescore-{datetime.utcnow():%Y%m%d-%H%M%S}",
+                        help="resume this run if it exists (default: a new run)")
+    parser.add_argument("--label", help="what changed, e.g. prompt-v4 (default: the LLM_MODELS in use)")
+    parser.add_argument("--user", help="only this user_id")
+    parser.add_argument("--role", help="only sessions for this interview role")
+    parser.add_argument("--since", help="sessions created at or after this ISO date (UTC)")
+    parser.add_argument("--until", help="sessions created before this ISO date (UTC)")
+    parser.add_argument("--only-fallback", action="store_true", help="only sessions whose current report is a fallback")
+    parser.add_argument("--include-unscored", action="store_true", help="also completed sessions with no report yet")
+    parser.add_argument("--no-promote", action="store_true", help="store versions without replacing current reports")
+    parser.add_argument("--retry-failed", action="store_true", help="re-score the run's failed sessions only")
+    parser.add_argument("--concurrency", type=int, default=4, help="reports generated at once")
+    parser.add_argument("--per-minute", type=float, default=30,
+                        help="sessions re-scored per minute (each may retry its LLM call up to 3 times)")
+    parser.add_argument("--batch-size", type=int, default=50, help="sessions per checkpoint")
+    parser.add_argument("--limit", type=int, help="stop after walking this many sessions (resume later)")
+    return parser
+
+
+async def main():
+    args = _parser().parse_args()
+    await mongo.connect_db()
+    await init_llm_client()
+    try:
+        run = await run_rescore(mongo.get_db(), args)
+        print(f"✅ {run['_id']} {run['status']}: {run['counts']}, {len(run.get('failed_ids', []))} failed")
+    finally:
+        await close_llm_client()
+        await mongo.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
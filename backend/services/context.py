@@ -0,0 +1,75 @@
+"""
+Rolling context window for interview turns.
+
+Keeps the interview history under a token budget by sending only the most
+recent turns verbatim and folding everything older into a compact running
+summary. The summary is stored on the session (`context_summary` /
+`context_summarized`) so each turn only folds the messages that have just
+left the window. The budget covers the history only; the session prefix
+(rules, resume, JD) is bounded separately where it is built.
+"""
+import os
+from typing import List, Dict, Tuple
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2000"))   # summary + verbatim turns
+CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "3"))   # question + answer pairs kept verbatim
+CONTEXT_JD_MAX_CHARS = int(os.getenv("CONTEXT_JD_MAX_CHARS", "4000"))   # the resume is capped by PDF_MAX_CHARS
+SUMMARY_LINE_CHARS = 180
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars per token) — good enough for budgeting."""
+    return len(text) // 4 + 1 if text else 0
+
+
+def _compress(msg: Dict) -> str:
+    """One summary line per message: the gist of the question or answer, plus its score."""
+    content = " ".join(msg["content"].split())
+    if len(content) > SUMMARY_LINE_CHARS:
+        content = content[:SUMMARY_LINE_CHARS].rstrip() + "…"
+    if msg["role"] == "ai":
+        return f"- Interviewer asked: {content}"
+    line = f"- Candidate answered: {content}"
+    if msg.get("score") is not None:
+        line += f" (scored {msg['score']}/10)"
+    return line
+
+
+def build_context(
+    tail: List[Dict],
+    summary: str = "",
+    summarized: int = 0,
+    budget: int = CONTEXT_TOKEN_BUDGET,
+    keep_turns: int = CONTEXT_KEEP_TURNS,
+) -> Tuple[List[Dict], str, str, int]:
+    """
+    Fit one turn's history into `budget` tokens.
+
+    `tail` is every message after the first `summarized` ones, oldest first.
+    Returns (window, prompt_summary, summary, summarized): the verbatim
+    history and summary to send, then the updated summary state to store.
+    The prompt summary may drop old lines to fit; the stored one never does.
+    """
+    lines = summary.splitlines() if summary else []
+    window = list(tail)
+    keep = max(2, keep_turns * 2)   # never fewer than the last question and its answer
+
+    # Fold everything older than the last N turns
+    fold = max(0, len(window) - keep)
+    lines.extend(_compress(msg) for msg in window[:fold])
+    window = window[fold:]
+
+    def total(skip: int = 0) -> int:
+        return sum(estimate_tokens(line) for line in lines[skip:]) + sum(estimate_tokens(m["content"]) for m in window)
+
+    # Still over budget — shrink the verbatim window down to the latest question and answer
+    while len(window) > 2 and total() > budget:
+        lines.append(_compress(window.pop(0)))
+        fold += 1
+
+    # Last resort — leave the oldest summary lines out of this prompt (they stay stored)
+    skip = 0
+    while skip < len(lines) and total(skip) > budget:
+        skip += 1
+
+    return window, "\n".join(lines[skip:]), "\n".join(lines), summarized + fold
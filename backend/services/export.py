@@ -0,0 +1,121 @@
+"""
+Streaming exports of sessions with their reports and transcripts.
+
+Sessions come off a batched cursor (see repository.iter_export_batches),
+are serialised as NDJSON (one session per line, transcript included) or
+CSV (one row per message, session and report columns repeated) and are
+flushed in EXPORT_CHUNK_BYTES chunks, optionally through an incremental
+gzip compressor. Memory stays bounded by one batch however large the
+export is.
+"""
+import csv
+import io
+import os
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+
+from db import repository
+from utils.metrics import span
+from utils.responses import dumps
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "100"))
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", "65536"))
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+CSV_COLUMNS = [
+    "session_id", "user_id", "session_role", "level", "status", "created_at", "completed_at",
+    "overall_score", "recommendation", "turn", "speaker", "content", "score", "feedback",
+    "weak_points", "timestamp",
+]
+
+
+def _iso(value) -> str:
+    return value.isoformat() if isinstance(value, datetime) else ""
+
+
+def _session_record(session: Dict[str, Any], messages: List[Dict]) -> Dict[str, Any]:
+    return {
+        "session_id": str(session["_id"]),
+        "user_id": session.get("user_id"),
+        "role": session.get("role"),
+        "level": session.get("level"),
+        "rounds": session.get("rounds", []),
+        "status": session.get("status"),
+        "created_at": session.get("created_at"),
+        "completed_at": session.get("completed_at"),
+        "question_count": session.get("question_count", 0),
+        "report": {
+            "overall_score": session.get("overall_score"),
+            "category_scores": session.get("category_scores", {}),
+            "strengths": session.get("strengths", []),
+            "improvements": session.get("improvements", []),
+            "summary": session.get("summary", ""),
+            "recommendation": session.get("recommendation", ""),
+        } if session.get("overall_score") is not None else None,
+        "transcript": [
+            {
+                "role": msg["role"],
+                "content": msg["content"],
+                "score": msg.get("score"),
+                "feedback": msg.get("feedback"),
+                "weak_points": msg.get("weak_points", []),
+                "timestamp": msg.get("timestamp"),
+            }
+            for msg in messages
+        ],
+    }
+
+
+def _write_ndjson(out: io.StringIO, session: Dict[str, Any], messages: List[Dict]):
+    out.write(dumps(_session_record(session, messages)).decode("utf-8"))
+    out.write("\n")
+
+
+def _write_csv(writer, session: Dict[str, Any], messages: List[Dict]):
+    head = [
+        str(session["_id"]), session.get("user_id", ""), session.get("role", ""), session.get("level", ""),
+        session.get("status", ""), _iso(session.get("created_at")), _iso(session.get("completed_at")),
+        session.get("overall_score", ""), session.get("recommendation", ""),
+    ]
+    for turn, msg in enumerate(messages, start=1):
+        writer.writerow(head + [
+            turn, msg["role"], msg["content"], msg.get("score", ""), msg.get("feedback") or "",
+            "; ".join(msg.get("weak_points") or []), _iso(msg.get("timestamp")),
+        ])
+
+
+async def export_sessions(db, query: Dict[str, Any], fmt: str, compress: bool = False) -> AsyncIterator[bytes]:
+    """Yield the export of every session matching `query` as encoded (and maybe gzipped) chunks."""
+    gzip = zlib.compressobj(wbits=31) if compress else None   # wbits=31 → gzip container
+    out = io.StringIO()
+    writer = csv.writer(out) if fmt == "csv" else None
+    if writer:
+        writer.writerow(CSV_COLUMNS)
+
+    def drain() -> bytes:
+        data = out.getvalue().encode("utf-8")
+        out.seek(0)
+        out.truncate()
+        return gzip.compress(data) if gzip else data
+
+    async for batch in repository.iter_export_batches(db, query, EXPORT_BATCH_SIZE):
+        chunks = []
+        with span("export.batch"):
+            for session, messages in batch:
+                if writer:
+                    _write_csv(writer, session, messages)
+                else:
+                    _write_ndjson(out, session, messages)
+                if out.tell() >= EXPORT_CHUNK_BYTES:
+                    chunks.append(drain())
+        for chunk in chunks:
+            if chunk:
+                yield chunk
+
+    tail = drain()
+    if gzip:
+        tail += gzip.flush()
+    if tail:
+        yield tail
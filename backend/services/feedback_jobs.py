@@ -0,0 +1,137 @@
+"""
+Background queue for feedback report generation.
+
+POST /feedback/generate enqueues a job and returns 202 straight away; a small
+pool of in-process workers runs the LLM call. Jobs live in the
+`feedback_jobs` collection (one per session + transcript hash), so duplicate
+requests share a job and anything queued or mid-run when the process died is
+picked up again at startup. Workers claim a job with a lease before running
+it, so two processes never generate the same report at once.
+"""
+import asyncio
+import os
+from typing import Dict, Any, List, Optional
+
+from db.mongo import get_db
+from db import repository
+from db.session_cache import session_cache
+from services.gemini import generate_feedback_report
+from services.user_stats import report_contribution, apply_report_stats
+from utils.helpers import transcript_entry, transcript_hash
+from utils.metrics import span
+
+FEEDBACK_WORKERS = int(os.getenv("FEEDBACK_WORKERS", "2"))
+FEEDBACK_JOB_LEASE_SECONDS = int(os.getenv("FEEDBACK_JOB_LEASE_SECONDS", "300"))
+
+_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+
+
+def job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a job document."""
+    return {
+        "job_id": str(job["_id"]),
+        "session_id": job["session_id"],
+        "status": job["status"],
+        "attempts": job.get("attempts", 0),
+        "error": job.get("error"),
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+async def enqueue_feedback_job(session_id: str, user_id: str, digest: str) -> Dict[str, Any]:
+    """Create (or reuse) the job for this transcript and make sure a worker will run it."""
+    db = get_db()
+    job = await repository.upsert_feedback_job(db, session_id, user_id, digest)
+    if job["status"] in ("done", "failed"):
+        # Done without a matching report means the last run fell back — try again
+        job = await repository.requeue_feedback_job(db, job["_id"]) or job
+    if job["status"] == "queued" and _queue is not None:
+        _queue.put_nowait(job["_id"])
+    return job
+
+
+async def save_generated_report(
+    db,
+    user_id: str,
+    session_id: str,
+    session: Dict[str, Any],
+    report: Dict[str, Any],
+    transcript: List[Dict],
+    version: Optional[int] = None,
+):
+    """Make `report` the session's current one and apply its stats and usage."""
+    # A fallback report is saved for display but not marked as done, so the next POST retries
+    digest = None if report.get("is_fallback") else transcript_hash(transcript)
+    contribution = report_contribution(session, report, transcript)
+    with span("feedback.save"):
+        await repository.save_report(db, session_id, report, digest, contribution, version)
+        await apply_report_stats(
+            db, user_id, session_id, session.get("stats_contribution"), contribution,
+        )
+        if report.get("usage"):
+            await repository.record_usage(
+                db, repository.usage_event(user_id, session_id, "feedback", report["usage"]),
+            )
+    session_cache.invalidate(session_id)
+
+
+async def _run_job(job_id):
+    db = get_db()
+    job = await repository.claim_feedback_job(db, job_id, FEEDBACK_JOB_LEASE_SECONDS)
+    if not job:
+        return  # already claimed or finished elsewhere
+
+    session_id = job["session_id"]
+    try:
+        session, messages = await asyncio.gather(
+            repository.get_session(db, session_id, job["user_id"], repository.REPORT_FIELDS),
+            repository.list_messages(db, session_id),
+        )
+        if not session:
+            raise ValueError("Session not found")
+        transcript = [transcript_entry(msg) for msg in messages]
+
+        with span("feedback.generate"):
+            report = await generate_feedback_report(
+                role=session["role"],
+                level=session["level"],
+                rounds=session["rounds"],
+                transcript=transcript,
+            )
+        await save_generated_report(db, job["user_id"], session_id, session, report, transcript)
+        await repository.update_feedback_job(db, job_id, {"status": "done", "lease_until": None})
+    except Exception as e:
+        print(f"Feedback job {job_id} failed: {e}")
+        await repository.update_feedback_job(
+            db, job_id, {"status": "failed", "error": str(e), "lease_until": None},
+        )
+
+
+async def _worker():
+    while True:
+        job_id = await _queue.get()
+        try:
+            await _run_job(job_id)
+        except Exception as e:
+            print(f"Feedback worker error: {e}")
+        finally:
+            _queue.task_done()
+
+
+async def start_feedback_workers():
+    """Start the worker pool and re-queue jobs left behind by a previous process."""
+    global _queue
+    _queue = asyncio.Queue()
+    for job_id in await repository.pending_feedback_job_ids(get_db()):
+        _queue.put_nowait(job_id)
+    _workers.extend(asyncio.create_task(_worker()) for _ in range(FEEDBACK_WORKERS))
+    print(f"✅ Feedback workers started ({FEEDBACK_WORKERS}, {_queue.qsize()} pending)")
+
+
+async def stop_feedback_workers():
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
@@ -3,59 +3,147 @@ AI service — powered by OpenRouter (OpenAI-compatible endpoint).
 Falls back gracefully if the API key is missing.
 """
 import os
-import json
 import re
 import asyncio
 import pathlib
-from typing import List, Dict, Any
+import time
+from functools import lru_cache
+from typing import List, Dict, Any, AsyncIterator, Optional
+import httpx
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
+
+from models.llm import InterviewTurn, FeedbackReport
+from services.context import CONTEXT_JD_MAX_CHARS, build_context
+from services.llm_json import parse_model
+from services.model_router import ModelRouter
+from utils.metrics import on_collect, span
 
 # Load .env from backend root regardless of CWD
 _ENV_PATH = pathlib.Path(__file__).parent.parent / ".env"
 load_dotenv(dotenv_path=_ENV_PATH, override=True)
 
 # OpenRouter config
-OPENROUTER_BASE = "https://openrouter.ai/api/v1"
+OPENROUTER_BASE = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
 MODEL = "stepfun/step-3.5-flash:free"   # confirmed working free model on OpenRouter
+# Ordered preference list for the model router; backups take hedged and failed-over calls
+LLM_MODELS = [m.strip() for m in (os.getenv("LLM_MODELS") or MODEL).split(",") if m.strip()]
+
+
+# Shared client config — one pooled client per process, created in main.lifespan
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "90"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+# Ask for JSON mode (response_format=json_object); OpenRouter drops it for models without support
+LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() == "true"
+_JSON_FORMAT = {"response_format": {"type": "json_object"}} if LLM_JSON_MODE else {}
+
+_client: Optional[AsyncOpenAI] = None
+_llm_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+_router = ModelRouter(LLM_MODELS)
+on_collect(_router.export_metrics)
+
+
+def _new_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_SECONDS,
+        ),
+        timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=10.0),
+    )
 
 
-def _get_client() -> OpenAI:
+def _new_client(http_client: Optional[httpx.AsyncClient] = None) -> AsyncOpenAI:
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
         raise ValueError("OPENROUTER_API_KEY is not set in .env")
     referer = os.getenv("ALLOWED_ORIGIN", "http://localhost:3000")
-    return OpenAI(
+    return AsyncOpenAI(
         api_key=api_key,
         base_url=OPENROUTER_BASE,
         default_headers={
             "HTTP-Referer": referer,
             "X-Title": "InterviewIQ",
         },
+        http_client=http_client or _new_http_client(),
     )
 
 
-def _build_system_prompt(
-    role: str,
-    level: str,
-    current_round: str,
-    resume_text: str,
-    job_description: str,
-    question_count: int,
-) -> str:
-    return f"""You are a professional technical interviewer at a top tech company conducting a real job interview.
+def _get_client() -> AsyncOpenAI:
+    """Return the shared client, creating it lazily outside the app lifespan (scripts, shells)."""
+    global _client
+    if _client is None:
+        _client = _new_client()
+    return _client
 
-=== CANDIDATE INFO ===
-Target Role: {role}
-Experience Level: {level}
-Current Round: {current_round}
-Questions Asked So Far: {question_count}
 
-=== RESUME SUMMARY ===
-{resume_text or "No resume provided — use general knowledge for this role."}
+async def init_llm_client():
+    """Create the shared client and open a pooled connection before the first turn."""
+    global _client
+    http_client = _new_http_client()
+    try:
+        _client = _new_client(http_client)
+    except ValueError as e:
+        await http_client.aclose()
+        print(f"⚠️  LLM client not initialised: {e}")
+        return
+    try:
+        # Any response will do — this only pays the DNS + TLS handshake up front
+        await http_client.head(OPENROUTER_BASE, timeout=5.0)
+        print("✅ LLM connection pool warmed up")
+    except Exception as e:
+        print(f"⚠️  LLM warm-up failed: {e}")
+
+
+async def close_llm_client():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+        print("LLM client closed")
 
-=== JOB DESCRIPTION ===
-{job_description or "No JD provided — focus on core skills for the role."}
+
+def llm_router_stats() -> Dict[str, Any]:
+    return _router.stats()
+
+
+async def _complete(kind: str, **kwargs):
+    """Routed chat completion; returns (model, response)."""
+    async def attempt(model: str):
+        return await _get_client().chat.completions.create(model=model, **kwargs)
+    with span(f"llm.{kind}"):
+        return await _router.run(kind, attempt)
+
+
+async def _open_stream(**kwargs):
+    """Routed streaming completion, hedged on time to first chunk; returns (model, chunks)."""
+    async def attempt(model: str):
+        stream = await _get_client().chat.completions.create(model=model, stream=True, **kwargs)
+        try:
+            first = await stream.__anext__()
+        except BaseException:
+            await stream.close()     # lost the race or failed before any output
+            raise
+        return stream, first
+
+    with span("llm.stream_first_chunk"):
+        model, (stream, first) = await _router.run("stream", attempt)
+
+    async def chunks():
+        yield first
+        async for chunk in stream:
+            yield chunk
+    return model, chunks()
+
+
+# Prompt layout for provider prefix caching: everything that is fixed for a
+# session (rules, then candidate, resume and JD) comes first and is
+# byte-identical on every turn; the state that changes per turn is sent as a
+# short system message after the history.
+_INTERVIEWER_RULES = """You are a professional technical interviewer at a top tech company conducting a real job interview.
 
 === YOUR BEHAVIOR RULES ===
 1. Ask ONE focused question at a time. Never bundle multiple questions.
@@ -70,50 +158,127 @@ Questions Asked So Far: {question_count}
 
 === RESPONSE FORMAT (STRICT JSON ONLY) ===
 Respond with ONLY valid JSON. No markdown, no text outside JSON.
-{{
+{
   "reply": "Your next question or follow-up as the interviewer...",
   "score": 7,
   "feedback": "One sentence evaluating the candidate's LAST answer.",
   "weak_points": ["gap1", "gap2"],
   "is_follow_up": false,
   "interview_complete": false
-}}
+}
+
+If Questions Asked So Far is 0 (first message), welcome the candidate briefly and ask your first question. Set score and feedback to null.
+"""
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit].rstrip() + "…"
+
+
+@lru_cache(maxsize=256)
+def _build_session_prefix(role: str, level: str, resume_text: str, job_description: str) -> str:
+    """The per-session system prompt. Memoized so every turn sends the exact same bytes."""
+    return f"""{_INTERVIEWER_RULES}
+=== CANDIDATE INFO ===
+Target Role: {role}
+Experience Level: {level}
+
+=== RESUME SUMMARY ===
+{resume_text or "No resume provided — use general knowledge for this role."}
 
-If question_count is 0 (first message), welcome the candidate briefly and ask your first question. Set score and feedback to null.
+=== JOB DESCRIPTION ===
+{_clip(job_description, CONTEXT_JD_MAX_CHARS) or "No JD provided — focus on core skills for the role."}
 """
 
 
-def _conversation_to_messages(history: List[Dict], system: str) -> List[Dict]:
-    """Convert stored history to OpenAI message format."""
+def _build_turn_suffix(current_round: str, question_count: int) -> str:
+    return f"""=== CURRENT STATE ===
+Current Round: {current_round}
+Questions Asked So Far: {question_count}"""
+
+
+def _conversation_to_messages(history: List[Dict], system: str, summary: str = "", suffix: str = "") -> List[Dict]:
+    """Convert stored history to OpenAI message format: stable prefix, summary, history, per-turn state."""
     msgs = [{"role": "system", "content": system}]
+    if summary:
+        msgs.append({"role": "system", "content": f"=== EARLIER IN THIS INTERVIEW ===\n{summary}"})
     for msg in history:
         role = "assistant" if msg["role"] == "ai" else "user"
         msgs.append({"role": role, "content": msg["content"]})
+    if suffix:
+        msgs.append({"role": "system", "content": suffix})
     return msgs
 
 
-def _parse_response(raw: str) -> Dict[str, Any]:
-    """Safely parse JSON response by extracting the JSON block."""
-    try:
-        # Find the first { and last } to extract pure JSON
-        start = raw.find('{')
-        end = raw.rfind('}')
-        if start != -1 and end != -1 and end >= start:
-            clean = raw[start:end+1]
-            return json.loads(clean)
-        # Fallback if no braces found
-        clean = re.sub(r"```(?:json)?", "", raw).strip().strip("`")
-        return json.loads(clean)
-    except Exception as e:
-        print(f"JSON Parse Error: {e} -> Raw: {raw[:200]}")
-        return {
-            "reply": raw.strip(),
-            "score": None,
-            "feedback": None,
-            "weak_points": [],
-            "is_follow_up": False,
-            "interview_complete": False,
-        }
+def _turn_messages(
+    role: str,
+    level: str,
+    current_round: str,
+    resume_text: str,
+    job_description: str,
+    history: List[Dict],
+    question_count: int,
+    context_summary: str,
+    context_summarized: int,
+):
+    """Build the prompt for one turn inside the context budget. Returns (messages, context_state)."""
+    prefix = _build_session_prefix(role, level, resume_text or "", job_description or "")
+    suffix = _build_turn_suffix(current_round, question_count)
+    window, prompt_summary, summary, summarized = build_context(history, context_summary, context_summarized)
+    messages = _conversation_to_messages(window, prefix, prompt_summary, suffix)
+    return messages, {"summary": summary, "summarized": summarized}
+
+
+def _usage_dict(
+    usage,
+    model: str,
+    started: float,
+    first_token_at: Optional[float] = None,
+    parsed: bool = True,
+) -> Dict[str, Any]:
+    """
+    Accounting for one LLM call: token counts from the OpenAI-style usage
+    block (including provider prefix-cache hits), wall time, time to first
+    token (streaming only), model and whether the output parsed.
+    """
+    details = getattr(usage, "prompt_tokens_details", None) if usage else None
+    return {
+        "model": model,
+        "prompt_tokens": (usage.prompt_tokens or 0) if usage else 0,
+        "completion_tokens": (usage.completion_tokens or 0) if usage else 0,
+        "cached_tokens": (getattr(details, "cached_tokens", None) or 0) if details else 0,
+        "wall_ms": round((time.perf_counter() - started) * 1000, 1),
+        "ttft_ms": round((first_token_at - started) * 1000, 1) if first_token_at else None,
+        "parsed": parsed,
+        "calls": 1,
+    }
+
+
+def _sum_usage(calls: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Combine the accounting of several calls (e.g. feedback retries) into one record."""
+    if not calls:
+        return None
+    total = dict(calls[-1])
+    for key in ("prompt_tokens", "completion_tokens", "cached_tokens", "wall_ms", "calls"):
+        total[key] = sum(c[key] for c in calls)
+    total["wall_ms"] = round(total["wall_ms"], 1)
+    return total
+
+
+def _parse_turn(raw: str):
+    """Returns (turn, ok) — on failure, a turn built from the raw text and False."""
+    turn = parse_model(raw, InterviewTurn)
+    if turn is not None:
+        return turn, True
+    print(f"JSON Parse Error -> Raw: {(raw or '')[:200]}")
+    return {
+        "reply": (raw or "").strip(),
+        "score": None,
+        "feedback": None,
+        "weak_points": [],
+        "is_follow_up": False,
+        "interview_complete": False,
+    }, False
 
 
 async def get_next_interview_turn(
@@ -124,22 +289,170 @@ async def get_next_interview_turn(
     job_description: str,
     history: List[Dict],
     question_count: int,
+    context_summary: str = "",
+    context_summarized: int = 0,
 ) -> Dict[str, Any]:
-    system = _build_system_prompt(role, level, current_round, resume_text, job_description, question_count)
-    messages = _conversation_to_messages(history, system)
+    """
+    `history` holds the messages after the first `context_summarized` ones.
+    The returned dict carries the updated summary state under "context".
+    """
+    with span("llm.build_prompt"):
+        messages, context = _turn_messages(
+            role, level, current_round, resume_text, job_description,
+            history, question_count, context_summary, context_summarized,
+        )
+
+    async with _llm_slots:
+        started = time.perf_counter()
+        model, response = await _complete(
+            "turn",
+            messages=messages,
+            temperature=0.7,
+            max_tokens=600,
+            **_JSON_FORMAT,
+        )
+    raw = response.choices[0].message.content
+    result, parsed = _parse_turn(raw)
+    result["context"] = context
+    result["usage"] = _usage_dict(response.usage, getattr(response, "model", None) or model, started, parsed=parsed)
+    return result
+
+
+class _ReplyExtractor:
+    """
+    Incrementally pulls the value of the "reply" key out of a JSON object
+    that is still being streamed, so the text can be forwarded to the
+    client before the closing brace arrives.
+    """
+
+    _KEY = re.compile(r'"reply"\s*:\s*"')
+    _ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = -1      # index of the next unread char inside the reply string
+        self._high = None   # high surrogate of a \uXXXX pair still waiting for its low half
+        self.done = False
+
+    def _code_point(self, code: int, out: list):
+        """Emit one \\uXXXX escape, joining surrogate pairs (which may span chunks)."""
+        if 0xDC00 <= code <= 0xDFFF and self._high is not None:
+            out.append(chr(0x10000 + ((self._high - 0xD800) << 10) + (code - 0xDC00)))
+            self._high = None
+            return
+        self._flush_high(out)
+        if 0xD800 <= code <= 0xDBFF:
+            self._high = code
+        elif 0xDC00 <= code <= 0xDFFF:
+            out.append("\ufffd")     # a lone low surrogate can't be encoded
+        else:
+            out.append(chr(code))
+
+    def _flush_high(self, out: list):
+        if self._high is not None:
+            out.append("\ufffd")
+            self._high = None
+
+    def feed(self, chunk: str) -> str:
+        """Append a raw chunk and return any newly decoded reply text."""
+        self.buffer += chunk
+        if self.done:
+            return ""
+        if self._pos < 0:
+            match = self._KEY.search(self.buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        out = []
+        buf = self.buffer
+        i = self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                self._flush_high(out)
+                self.done = True
+                i += 1
+                break
+            if ch != "\\":
+                self._flush_high(out)
+                out.append(ch)
+                i += 1
+                continue
+            # Escape sequence — wait for the rest of it if it was split across chunks
+            if i + 1 >= len(buf):
+                break
+            esc = buf[i + 1]
+            if esc == "u":
+                if i + 6 > len(buf):
+                    break
+                try:
+                    self._code_point(int(buf[i + 2:i + 6], 16), out)
+                except ValueError:
+                    pass
+                i += 6
+            else:
+                self._flush_high(out)
+                out.append(self._ESCAPES.get(esc, esc))
+                i += 2
+        self._pos = i
+        return "".join(out)
 
-    def _call():
-        client = _get_client()
-        response = client.chat.completions.create(
-            model=MODEL,
+
+async def stream_next_interview_turn(
+    role: str,
+    level: str,
+    current_round: str,
+    resume_text: str,
+    job_description: str,
+    history: List[Dict],
+    question_count: int,
+    context_summary: str = "",
+    context_summarized: int = 0,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of get_next_interview_turn.
+    Yields {"type": "token", "delta": str} events as the interviewer's reply
+    arrives, then a single {"type": "result", "data": {...}} with the parsed turn.
+    """
+    with span("llm.build_prompt"):
+        messages, context = _turn_messages(
+            role, level, current_round, resume_text, job_description,
+            history, question_count, context_summary, context_summarized,
+        )
+
+    extractor = _ReplyExtractor()
+    usage = None
+    first_token_at = None
+    async with _llm_slots:
+        started = time.perf_counter()
+        model, stream = await _open_stream(
             messages=messages,
             temperature=0.7,
             max_tokens=600,
+            stream_options={"include_usage": True},
+            **_JSON_FORMAT,
         )
-        return response.choices[0].message.content
+        async for chunk in stream:
+            if chunk.usage:
+                usage = chunk.usage
+            if getattr(chunk, "model", None):
+                model = chunk.model
+            if not chunk.choices:
+                continue
+            piece = chunk.choices[0].delta.content
+            if not piece:
+                continue
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            delta = extractor.feed(piece)
+            if delta:
+                yield {"type": "token", "delta": delta}
 
-    raw = await asyncio.to_thread(_call)
-    return _parse_response(raw)
+    result, parsed = _parse_turn(extractor.buffer)
+    result["context"] = context
+    result["usage"] = _usage_dict(usage, model, started, first_token_at, parsed)
+    yield {"type": "result", "data": result}
 
 
 async def generate_feedback_report(
@@ -174,24 +487,32 @@ Return ONLY valid JSON:
   "recommendation": "Strong Hire | Hire | Borderline | No Hire"
 }}"""
 
-    def _call_feedback():
-        client = _get_client()
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": "You are an expert. Output ONLY raw JSON containing overall_score, category_scores, strengths, improvements, summary, and recommendation. Do not include markdown ticks."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.1,
-            max_tokens=1500,
-        )
-        return response.choices[0].message.content
+    calls = []
+
+    async def _call_feedback():
+        async with _llm_slots:
+            started = time.perf_counter()
+            model, response = await _complete(
+                "report",
+                messages=[
+                    {"role": "system", "content": "You are an expert. Output ONLY raw JSON containing overall_score, category_scores, strengths, improvements, summary, and recommendation. Do not include markdown ticks."},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.1,
+                max_tokens=1500,
+                **_JSON_FORMAT,
+            )
+        raw = response.choices[0].message.content
+        parsed = parse_model(raw, FeedbackReport)
+        ok = parsed is not None
+        calls.append(_usage_dict(response.usage, getattr(response, "model", None) or model, started, parsed=ok))
+        return parsed, ok
 
     for attempt in range(3):
         try:
-            raw = await asyncio.to_thread(_call_feedback)
-            parsed = _parse_response(raw)
-            if parsed.get("overall_score") is not None and "strengths" in parsed:
+            parsed, ok = await _call_feedback()
+            if ok:
+                parsed["usage"] = _sum_usage(calls)
                 return parsed
         except Exception as e:
             print(f"Feedback generation error on attempt {attempt+1}: {e}")
@@ -209,5 +530,7 @@ Return ONLY valid JSON:
         "strengths": ["Completed the interview session successfully."],
         "improvements": ["We could not generate detailed feedback at this time due to AI server limits."],
         "summary": "The AI encountered an issue generating a full analytical report for this session. Please try another session or wait a few minutes.",
-        "recommendation": "Borderline"
+        "recommendation": "Borderline",
+        "is_fallback": True,
+        "usage": _sum_usage(calls),
     }
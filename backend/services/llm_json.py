@@ -0,0 +1,131 @@
+"""
+Tolerant JSON parsing for LLM output.
+
+Models drift from "ONLY valid JSON" in a handful of predictable ways:
+markdown fences, prose around the object, trailing commas, raw newlines
+inside strings and output cut off at max_tokens. Each of those is repaired
+locally here, then the object is validated against its pydantic schema —
+recovering a reply this way is far cheaper than asking the model again.
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from utils.metrics import span
+
+_FENCE = re.compile(r"```(?:json)?", re.IGNORECASE)
+_MAX_CUTS = 8   # how far back to trim a truncated object before giving up
+
+_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def _strip_trailing_comma(out: List[str]):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def _close(out: List[str], stack: List[str]) -> str:
+    out = list(out)
+    for closer in reversed(stack):
+        _strip_trailing_comma(out)
+        out.append(closer)
+    return "".join(out)
+
+
+def _repair_candidates(text: str) -> List[str]:
+    """
+    Rewrite the first JSON object in `text` into candidates that json.loads
+    is likely to accept: control characters in strings escaped, trailing
+    commas dropped and, if the output was truncated, the open string and
+    brackets closed — first as-is, then cut back to earlier commas.
+    """
+    start = text.find("{")
+    if start == -1:
+        return []
+
+    out: List[str] = []
+    stack: List[str] = []
+    cuts: List[Tuple[int, Tuple[str, ...]]] = []   # (length, open brackets) at each top-level comma
+    in_str = escape = False
+
+    for ch in text[start:]:
+        if in_str:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_str = False
+            elif ch in _ESCAPES:
+                ch = _ESCAPES[ch]
+            elif ch < " ":
+                continue
+            out.append(ch)
+            continue
+
+        if ch == '"':
+            in_str = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            _strip_trailing_comma(out)
+            out.append(stack.pop())     # tolerate a mismatched closer
+            if not stack:
+                return ["".join(out)]
+            continue
+        elif ch == ",":
+            cuts.append((len(out), tuple(stack)))
+        out.append(ch)
+
+    # Truncated: close what is open, or fall back to the last complete members
+    if escape:
+        out.pop()
+    candidates = [_close(out + (['"'] if in_str else []), stack)]
+    for length, open_stack in reversed(cuts[-_MAX_CUTS:]):
+        candidates.append(_close(out[:length], list(open_stack)))
+    return candidates
+
+
+def parse_json_object(raw: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """Returns (object, repaired) — object is None if nothing usable was found."""
+    if not raw:
+        return None, False
+    text = _FENCE.sub("", raw)
+
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            obj = json.loads(text[start:end + 1])
+            if isinstance(obj, dict):
+                return obj, False
+        except ValueError:
+            pass
+
+    for candidate in _repair_candidates(text):
+        try:
+            obj = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(obj, dict):
+            return obj, True
+    return None, False
+
+
+def parse_model(raw: str, schema: Type[BaseModel]) -> Optional[Dict[str, Any]]:
+    """Parse, repair and validate LLM output against `schema`; None if it can't be salvaged."""
+    with span("llm.parse"):
+        obj, repaired = parse_json_object(raw)
+        if obj is None:
+            return None
+        try:
+            result = schema.model_validate(obj).model_dump()
+        except ValidationError as e:
+            print(f"LLM output failed {schema.__name__} validation: {e.error_count()} error(s)")
+            return None
+    if repaired:
+        print(f"🔧 Repaired malformed {schema.__name__} JSON from the LLM")
+    return result
@@ -0,0 +1,220 @@
+"""
+Latency-aware routing across an ordered list of LLM models.
+
+Each call goes to the first model whose circuit is closed. If it hasn't
+answered by that model's rolling p95 latency (for the same kind of call), a
+hedged request goes to the next model and whichever finishes first wins;
+the loser is cancelled. A failed call fails over to the next model. Repeated
+429 / 5xx / connection failures open a model's circuit for a cooldown, after
+which it is half-open: the first call to claim its trial slot decides whether
+it closes again, and other calls skip it until that one finishes. Attempt
+outcomes and circuit states are exported on /metrics.
+"""
+import asyncio
+import os
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from openai import APIConnectionError
+
+from utils.metrics import LLM_CIRCUIT_STATE, LLM_ROUTE_OUTCOMES
+
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+LLM_HEDGE_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", "6"))      # until p95 is known
+LLM_HEDGE_MIN_SECONDS = float(os.getenv("LLM_HEDGE_MIN_SECONDS", "1"))
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "3"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+_MIN_SAMPLES = 20   # latencies needed before p95 replaces the default hedge delay
+_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _is_upstream_failure(e: BaseException) -> bool:
+    """Rate limits, server errors and network failures — the ones a circuit should count."""
+    status = getattr(e, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(e, (APIConnectionError, asyncio.TimeoutError))
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _ModelStats:
+    def __init__(self):
+        self.latencies: Dict[str, Deque[float]] = {}
+        self.outcomes: Deque[bool] = deque(maxlen=LLM_LATENCY_WINDOW)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.breaker_opens = 0
+        self.trial_in_flight = False
+
+    def state(self, now: float) -> str:
+        if self.open_until == 0.0:
+            return "closed"
+        return "open" if self.open_until > now else "half_open"
+
+    def available(self, now: float) -> bool:
+        state = self.state(now)
+        return state == "closed" or (state == "half_open" and not self.trial_in_flight)
+
+    def claim(self, now: float) -> Optional[bool]:
+        """
+        Whether a call may go to this model now: None if not, else True when
+        the call is the half-open trial (and now holds its slot).
+        """
+        state = self.state(now)
+        if state == "closed":
+            return False
+        if state == "open" or self.trial_in_flight:
+            return None
+        self.trial_in_flight = True
+        return True
+
+    def release_trial(self):
+        self.trial_in_flight = False
+
+    def p95(self, kind: str) -> Optional[float]:
+        window = self.latencies.get(kind)
+        if not window or len(window) < _MIN_SAMPLES:
+            return None
+        return _percentile(list(window), 0.95)
+
+    def record_success(self, kind: str, seconds: float):
+        self.latencies.setdefault(kind, deque(maxlen=LLM_LATENCY_WINDOW)).append(seconds)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self, upstream: bool) -> bool:
+        """Returns True when this failure opens the circuit."""
+        self.outcomes.append(False)
+        if not upstream:
+            return False
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= LLM_BREAKER_FAILURES:
+            was_closed = self.open_until == 0.0
+            self.open_until = time.monotonic() + LLM_BREAKER_COOLDOWN_SECONDS
+            self.breaker_opens += 1
+            return was_closed
+        return False
+
+
+class ModelRouter:
+    def __init__(self, models: List[str], hedge: bool = LLM_HEDGE_ENABLED):
+        if not models:
+            raise ValueError("ModelRouter needs at least one model")
+        self.models = list(models)
+        self.hedge = hedge
+        self._stats = {model: _ModelStats() for model in self.models}
+        self.decisions: Counter = Counter()     # (decision, model) -> count
+
+    def _candidates(self) -> Tuple[List[str], bool]:
+        """Models to try in order, and whether circuits gate them (False when every circuit is open)."""
+        now = time.monotonic()
+        healthy = [m for m in self.models if self._stats[m].available(now)]
+        if healthy:
+            return healthy, True
+        return list(self.models), False     # every circuit open: still try, in order
+
+    def hedge_delay(self, kind: str, model: str) -> float:
+        p95 = self._stats[model].p95(kind)
+        return max(LLM_HEDGE_MIN_SECONDS, p95 if p95 is not None else LLM_HEDGE_DELAY_SECONDS)
+
+    async def _timed(self, kind: str, model: str, attempt: Callable[[str], Awaitable[Any]]):
+        stats = self._stats[model]
+        started = time.perf_counter()
+        try:
+            result = await attempt(model)
+        except asyncio.CancelledError:
+            raise       # lost a hedge race — says nothing about the model
+        except Exception as e:
+            if stats.record_failure(_is_upstream_failure(e)):
+                print(f"⚠️  LLM circuit opened for {model} ({e.__class__.__name__}), "
+                      f"cooling down {LLM_BREAKER_COOLDOWN_SECONDS:.0f}s")
+            raise
+        stats.record_success(kind, time.perf_counter() - started)
+        return result
+
+    async def run(self, kind: str, attempt: Callable[[str], Awaitable[Any]]) -> Tuple[str, Any]:
+        """
+        Run `attempt(model)` with hedging and failover; returns (model, result)
+        from the first attempt to succeed, or raises the last error.
+        """
+        candidates, gated = self._candidates()
+        order = iter(candidates)
+        pending: Dict[asyncio.Task, Tuple[str, str]] = {}   # task -> (model, decision)
+        last_error: Optional[BaseException] = None
+
+        def launch(decision: str) -> bool:
+            for model in order:
+                trial = self._stats[model].claim(time.monotonic()) if gated else False
+                if trial is None:
+                    continue    # opened, or its half-open trial was taken, since candidates were picked
+                self.decisions[(decision, model)] += 1
+                task = asyncio.create_task(self._timed(kind, model, attempt))
+                if trial:
+                    # A done callback also runs for a task cancelled before it started
+                    task.add_done_callback(lambda _, stats=self._stats[model]: stats.release_trial())
+                pending[task] = (model, decision)
+                return True
+            return False
+
+        launch("primary")     # no await since _candidates(), so the first candidate is still claimable
+        first_model = next(iter(pending.values()))[0]
+        hedge_at = self.hedge_delay(kind, first_model) if self.hedge and len(self.models) > 1 else None
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, timeout=hedge_at, return_when=asyncio.FIRST_COMPLETED)
+                hedge_at = None
+                if not done:
+                    launch("hedge")
+                    continue
+                for task in done:
+                    model, decision = pending.pop(task)
+                    if task.exception() is None:
+                        self.decisions[("won", model)] += 1
+                        LLM_ROUTE_OUTCOMES.inc(model=model, decision=decision, outcome="won")
+                        return model, task.result()
+                    LLM_ROUTE_OUTCOMES.inc(model=model, decision=decision, outcome="failed")
+                    last_error = task.exception()
+                if not pending:
+                    launch("failover")
+            raise last_error
+        finally:
+            for task, (model, decision) in pending.items():
+                task.cancel()
+                LLM_ROUTE_OUTCOMES.inc(model=model, decision=decision, outcome="cancelled")
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def export_metrics(self):
+        """Set interviewiq_llm_circuit_state for each model; registered as a /metrics collector."""
+        now = time.monotonic()
+        for model, s in self._stats.items():
+            LLM_CIRCUIT_STATE.set(_STATE_VALUES[s.state(now)], model=model)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        models = {}
+        for model, s in self._stats.items():
+            models[model] = {
+                "state": s.state(now),
+                "trial_in_flight": s.trial_in_flight,
+                "error_rate": round(s.outcomes.count(False) / len(s.outcomes), 3) if s.outcomes else 0.0,
+                "breaker_opens": s.breaker_opens,
+                "latency_ms": {
+                    kind: {
+                        "p50": round(_percentile(list(w), 0.5) * 1000, 1),
+                        "p95": round(_percentile(list(w), 0.95) * 1000, 1),
+                        "samples": len(w),
+                    }
+                    for kind, w in s.latencies.items() if w
+                },
+                "decisions": {d: n for (d, m), n in self.decisions.items() if m == model},
+            }
+        return {"hedge": self.hedge, "models": models}
@@ -0,0 +1,76 @@
+"""
+Shared cache of opening turns — the welcome plus first question.
+
+The first turn of a session depends only on role, level, round, JD and
+resume, and cohorts start many sessions with identical inputs. Openings are
+pooled in the `opening_turns` collection under a hash of those normalised
+inputs: a new session is served a random variant from the pool with
+probability OPENING_REUSE_PROBABILITY, otherwise the LLM writes a fresh one
+which joins the pool (newest OPENING_VARIANTS kept, OPENING_TTL_SECONDS each).
+"""
+import hashlib
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from db import repository
+
+OPENING_REUSE_PROBABILITY = float(os.getenv("OPENING_REUSE_PROBABILITY", "0.8"))
+OPENING_VARIANTS = int(os.getenv("OPENING_VARIANTS", "5"))
+OPENING_TTL_SECONDS = int(os.getenv("OPENING_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+def _normalize(text: str) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def opening_key(session: Dict[str, Any]) -> str:
+    parts = [
+        session["role"],
+        session["level"],
+        session.get("current_round", session["rounds"][0]),
+        session.get("job_description", ""),
+        session.get("resume_text", ""),     # openings may mention the candidate's projects
+    ]
+    return hashlib.sha256("\x1f".join(_normalize(p) for p in parts).encode()).hexdigest()
+
+
+def is_opening(session: Dict[str, Any], history: List[Dict]) -> bool:
+    return not history and session.get("question_count", 0) == 0
+
+
+async def cached_opening(db, session: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """A pooled opening turn for this session's inputs, or None to generate a fresh one."""
+    if random.random() >= OPENING_REUSE_PROBABILITY:
+        return None
+    fresh_since = datetime.utcnow() - timedelta(seconds=OPENING_TTL_SECONDS)
+    variants = [
+        v for v in await repository.get_opening_variants(db, opening_key(session))
+        if v["created_at"] >= fresh_since
+    ]
+    if not variants:
+        return None
+    return {
+        "reply": random.choice(variants)["reply"],
+        "score": None,
+        "feedback": None,
+        "weak_points": [],
+        "is_follow_up": False,
+        "interview_complete": False,
+        "context": {"summary": "", "summarized": 0},
+        "usage": None,      # no LLM call
+    }
+
+
+async def remember_opening(db, session: Dict[str, Any], result: Dict[str, Any]):
+    """Add a freshly generated opening to the pool, unless the model's output didn't parse."""
+    if OPENING_VARIANTS <= 0 or not (result.get("usage") or {}).get("parsed"):
+        return
+    await repository.push_opening_variant(
+        db,
+        opening_key(session),
+        result["reply"],
+        OPENING_VARIANTS,
+        expires_at=datetime.utcnow() + timedelta(seconds=OPENING_TTL_SECONDS),
+    )
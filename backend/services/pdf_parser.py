@@ -1,29 +1,136 @@
-import pdfplumber
+import asyncio
 import io
-from fastapi import UploadFile
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import pdfplumber
+from fastapi import HTTPException, UploadFile
+
+from utils.metrics import span
+
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(5 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "10"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "3000"))
+PDF_PARSE_TIMEOUT_SECONDS = float(os.getenv("PDF_PARSE_TIMEOUT_SECONDS", "15"))
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", "2"))
+
+_READ_CHUNK = 64 * 1024
+
+# The pool, and the queue its workers report their pids on when they start
+_pool: Optional[Tuple[ProcessPoolExecutor, multiprocessing.SimpleQueue]] = None
+
+
+def _report_pid(pids: multiprocessing.SimpleQueue):
+    """Worker initializer, so a stuck worker can be killed without reaching into the executor."""
+    pids.put(os.getpid())
+
+
+def _get_pool() -> Tuple[ProcessPoolExecutor, multiprocessing.SimpleQueue]:
+    global _pool
+    if _pool is None:
+        pids = multiprocessing.SimpleQueue()
+        pool = ProcessPoolExecutor(max_workers=PDF_PARSE_WORKERS, initializer=_report_pid, initargs=(pids,))
+        _pool = (pool, pids)
+    return _pool
+
+
+def shutdown_pdf_pool():
+    global _pool
+    if _pool is not None:
+        _pool[0].shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
 
+def _recycle_pool(pool: ProcessPoolExecutor, pids: multiprocessing.SimpleQueue):
+    """
+    Kill a pool whose worker is stuck on a parse; the next upload starts a
+    fresh one. Parses still running in it fail and come back empty.
+    """
+    global _pool
+    if _pool is not None and _pool[0] is pool:
+        _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+    while not pids.empty():
+        try:
+            os.kill(pids.get(), signal.SIGTERM)
+        except OSError:
+            pass    # already exited
+
+
+def _extract(content: bytes, max_pages: int, max_chars: int, deadline: float) -> str:
+    """Runs in a worker process. Stops at the page limit, the char budget or the deadline."""
+    pages_text = []
+    total = 0
+    # pages= only builds page objects up to the limit; pdfplumber still walks the whole page tree
+    with pdfplumber.open(io.BytesIO(content), pages=range(1, max_pages + 1)) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text()
+            if text:
+                pages_text.append(text.strip())
+                total += len(pages_text[-1])
+            if total >= max_chars or time.time() > deadline:
+                break
+
+    full_text = "\n\n".join(pages_text)
+
+    # Truncate to keep prompt size reasonable
+    if len(full_text) > max_chars:
+        full_text = full_text[:max_chars] + "...[truncated]"
+
+    return full_text
 
-async def extract_text_from_pdf(file: UploadFile) -> str:
+
+async def _read_limited(file: UploadFile, max_bytes: int) -> bytes:
+    """Read the upload in chunks, rejecting it as soon as it passes max_bytes."""
+    chunks = []
+    size = 0
+    while True:
+        chunk = await file.read(_READ_CHUNK)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Resume PDF must be under {max_bytes // (1024 * 1024)} MB",
+            )
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def read_pdf_upload(file: UploadFile) -> bytes:
+    """Read an uploaded PDF, rejecting it with 413 once it passes PDF_MAX_BYTES."""
+    return await _read_limited(file, PDF_MAX_BYTES)
+
+
+async def extract_text(content: bytes) -> str:
     """
-    Read an uploaded PDF and return all extracted text as a single string.
-    Returns empty string if extraction fails.
+    Return the extracted text of a PDF as a single string.
+    Parsing runs in a process pool so it never blocks the event loop, and
+    is bounded by page count, character budget and a timeout.
+    Returns empty string if extraction fails or times out.
     """
+    deadline = time.time() + PDF_PARSE_TIMEOUT_SECONDS
+    pool, pids = _get_pool()
     try:
-        content = await file.read()
-        with pdfplumber.open(io.BytesIO(content)) as pdf:
-            pages_text = []
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    pages_text.append(text.strip())
-        
-        full_text = "\n\n".join(pages_text)
-        
-        # Truncate to ~3000 chars to keep prompt size reasonable
-        if len(full_text) > 3000:
-            full_text = full_text[:3000] + "...[truncated]"
-        
-        return full_text
+        loop = asyncio.get_running_loop()
+        with span("pdf.extract"):
+            return await asyncio.wait_for(
+                loop.run_in_executor(
+                    pool, _extract, content, PDF_MAX_PAGES, PDF_MAX_CHARS, deadline,
+                ),
+                timeout=PDF_PARSE_TIMEOUT_SECONDS,
+            )
+    except asyncio.TimeoutError:
+        # wait_for only abandons the future; the worker would keep parsing
+        print(f"PDF extraction timed out after {PDF_PARSE_TIMEOUT_SECONDS}s, restarting the parser pool")
+        _recycle_pool(pool, pids)
+        return ""
     except Exception as e:
         print(f"PDF extraction error: {e}")
         return ""
+
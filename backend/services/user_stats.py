@@ -0,0 +1,179 @@
+"""
+Per-user progress statistics, maintained incrementally.
+
+One `user_stats` document per user (keyed by user_id) holds running counts
+and score sums overall, per category and per role, the most recent scores
+as trend lines, and how many sessions each weak point came up in. Every
+generated report applies its session's contribution with a single $inc
+update; the contribution is also stored on the session, so a regenerated
+report replaces the old one instead of counting twice. Trend points and
+last_score follow the order sessions were completed in, not the order their
+reports were written, so a re-scored old session doesn't become the latest.
+The dashboard reads the whole thing with one _id lookup. scripts/rebuild_user_stats.py
+recomputes the document from the sessions to detect and fix drift.
+"""
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from db import repository
+
+STATS_TREND_POINTS = int(os.getenv("STATS_TREND_POINTS", "10"))
+STATS_TOP_WEAK_POINTS = int(os.getenv("STATS_TOP_WEAK_POINTS", "10"))
+
+
+def _key(name: str) -> str:
+    """Make a category / role / weak point usable as a MongoDB field name."""
+    return " ".join(str(name).split()).replace(".", "_").replace("$", "_")[:80]
+
+
+def _weak_point(text: str) -> str:
+    return _key(str(text).strip().lower())
+
+
+def report_contribution(session: Dict[str, Any], report: Dict[str, Any], transcript: List[Dict]) -> Optional[Dict]:
+    """What one session's report adds to its user's stats; None for fallback reports."""
+    if report.get("is_fallback") or report.get("overall_score") is None:
+        return None
+    weak_points = {
+        _weak_point(w)
+        for msg in transcript if msg["role"] == "user"
+        for w in msg.get("weak_points") or []
+    }
+    return {
+        "role": _key(session["role"]),
+        "overall": float(report["overall_score"]),
+        "categories": {_key(k): float(v) for k, v in (report.get("category_scores") or {}).items()},
+        "weak_points": sorted(w for w in weak_points if w),
+        "at": session.get("completed_at") or session.get("created_at") or datetime.utcnow(),
+    }
+
+
+def _increments(contribution: Optional[Dict], sign: int, into: Dict[str, float]):
+    if not contribution:
+        return
+    overall = contribution["overall"]
+    role = contribution["role"]
+    into["sessions_scored"] += sign
+    into["score_sum"] += sign * overall
+    into[f"roles.{role}.count"] += sign
+    into[f"roles.{role}.score_sum"] += sign * overall
+    for name, score in contribution["categories"].items():
+        into[f"categories.{name}.count"] += sign
+        into[f"categories.{name}.score_sum"] += sign * score
+    for point in contribution["weak_points"]:
+        into[f"weak_points.{point}"] += sign
+
+
+def _trend_point(session_id: str, score: float, at: datetime) -> Dict[str, Any]:
+    return {"session_id": session_id, "score": score, "at": at}
+
+
+async def apply_report_stats(
+    db,
+    user_id: str,
+    session_id: str,
+    old: Optional[Dict],
+    new: Optional[Dict],
+):
+    """Swap a session's previous contribution (if any) for its new one (if any)."""
+    if not old and not new:
+        return
+    inc: Dict[str, float] = defaultdict(float)
+    _increments(old, -1, inc)
+    _increments(new, 1, inc)
+
+    if old:
+        # Drop the old trend points first — $pull and $push can't share an update
+        await repository.pull_stats_trend(db, user_id, session_id, list(old["categories"]))
+
+    update: Dict[str, Any] = {
+        "$inc": {k: v for k, v in inc.items() if v},
+        "$set": {"updated_at": datetime.utcnow()},
+    }
+    if new:
+        at = new["at"]
+        update["$max"] = {"best_score": new["overall"]}
+        trend = {"$sort": {"at": 1}, "$slice": -STATS_TREND_POINTS}
+        update["$push"] = {
+            "recent_scores": {"$each": [_trend_point(session_id, new["overall"], at)], **trend},
+            **{
+                f"categories.{name}.recent": {"$each": [_trend_point(session_id, score, at)], **trend}
+                for name, score in new["categories"].items()
+            },
+        }
+    if not update["$inc"]:
+        del update["$inc"]
+    await repository.update_user_stats(db, user_id, update)
+
+    if new:
+        await repository.set_last_score(db, user_id, new["overall"], new["at"])
+    if old and (not new or new["overall"] < old["overall"]):
+        # $max can't lower best_score; look it up again if the replaced report may have held it
+        stats = await repository.get_user_stats(db, user_id)
+        if stats and stats.get("best_score") is not None and stats["best_score"] <= old["overall"]:
+            best = await repository.best_report_score(db, user_id)
+            await repository.update_user_stats(db, user_id, {"$set": {"best_score": best}})
+
+
+def stats_document(contributions: List[tuple]) -> Dict[str, Any]:
+    """Build a user_stats document from scratch out of (session_id, contribution) pairs, oldest first."""
+    inc: Dict[str, float] = defaultdict(float)
+    doc: Dict[str, Any] = {"recent_scores": [], "categories": {}, "roles": {}, "weak_points": {}}
+    for session_id, contribution in contributions:
+        _increments(contribution, 1, inc)
+        at = contribution["at"]
+        doc["recent_scores"].append(_trend_point(session_id, contribution["overall"], at))
+        for name, score in contribution["categories"].items():
+            doc["categories"].setdefault(name, {"recent": []})["recent"].append(_trend_point(session_id, score, at))
+        doc["best_score"] = max(doc.get("best_score", contribution["overall"]), contribution["overall"])
+        doc["last_score"] = contribution["overall"]
+        doc["last_scored_at"] = at
+
+    doc["recent_scores"] = doc["recent_scores"][-STATS_TREND_POINTS:]
+    for path, value in inc.items():
+        parts = path.split(".")
+        target = doc
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    for category in doc["categories"].values():
+        category["recent"] = category.get("recent", [])[-STATS_TREND_POINTS:]
+    doc["updated_at"] = datetime.utcnow()
+    return doc
+
+
+def _average(total: float, count: float) -> Optional[float]:
+    return round(total / count, 1) if count else None
+
+
+def stats_view(doc: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Public shape of a user_stats document (empty stats for a user with no reports)."""
+    doc = doc or {}
+    weak_points = sorted(
+        ((point, int(n)) for point, n in (doc.get("weak_points") or {}).items() if n > 0),
+        key=lambda item: (-item[1], item[0]),
+    )
+    return {
+        "sessions_scored": int(doc.get("sessions_scored", 0)),
+        "average_score": _average(doc.get("score_sum", 0), doc.get("sessions_scored", 0)),
+        "best_score": doc.get("best_score"),
+        "last_score": doc.get("last_score"),
+        "last_scored_at": doc.get("last_scored_at"),
+        "score_trend": [{"score": p["score"], "at": p["at"]} for p in doc.get("recent_scores", [])],
+        "categories": {
+            name: {
+                "average": _average(c.get("score_sum", 0), c.get("count", 0)),
+                "sessions": int(c.get("count", 0)),
+                "trend": [{"score": p["score"], "at": p["at"]} for p in c.get("recent", [])],
+            }
+            for name, c in (doc.get("categories") or {}).items() if c.get("count", 0) > 0
+        },
+        "roles": {
+            role: {"sessions": int(r["count"]), "average": _average(r.get("score_sum", 0), r["count"])}
+            for role, r in (doc.get("roles") or {}).items() if r.get("count", 0) > 0
+        },
+        "weak_points": [{"point": p, "sessions": n} for p, n in weak_points[:STATS_TOP_WEAK_POINTS]],
+        "updated_at": doc.get("updated_at"),
+    }
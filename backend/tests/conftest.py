@@ -0,0 +1,90 @@
+"""
+Shared fixtures: the app wired to an in-memory MongoDB (mongomock-motor) and
+a scripted stand-in for the OpenRouter client. Tests drive the app with
+httpx's ASGITransport inside asyncio.run, so concurrent requests share a loop.
+"""
+import asyncio
+import os
+from types import SimpleNamespace as NS
+
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("MONGO_EXPLAIN_ON_STARTUP", "false")
+os.environ.setdefault("RATE_LIMIT_TURN_BURST", "100")
+os.environ.setdefault("RATE_LIMIT_TURNS_IN_FLIGHT", "1")
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import main
+from db import mongo
+from db.session_cache import session_cache
+from services import gemini
+from utils import rate_limit
+
+
+class FakeLLM:
+    """Answers every call with `reply_json`; streams it in `chunk_size` pieces, after `gate` if set."""
+
+    def __init__(self):
+        self.reply_json = '{"reply": "Tell me about a project.", "score": 6, "feedback": "ok", ' \
+                          '"weak_points": [], "is_follow_up": false}'
+        self.chunk_size = 7
+        self.gate = None
+        self.chat = NS(completions=NS(create=self.create))
+
+    async def _stream(self):
+        if self.gate is not None:
+            await self.gate.wait()
+        raw = self.reply_json
+        for i in range(0, len(raw), self.chunk_size):
+            yield NS(choices=[NS(delta=NS(content=raw[i:i + self.chunk_size]))], usage=None)
+
+    async def create(self, **kwargs):
+        if kwargs.get("stream"):
+            return self._stream()
+        return NS(choices=[NS(message=NS(content=self.reply_json))], usage=None, model=kwargs["model"])
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = FakeLLM()
+    monkeypatch.setattr(gemini, "_get_client", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def db(monkeypatch):
+    database = AsyncMongoMockClient()["interviewiq"]
+    monkeypatch.setattr(mongo, "db", database)
+    monkeypatch.setattr(rate_limit, "_backend", rate_limit.MemoryRateLimitBackend())
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    session_cache.clear()
+    return database
+
+
+@pytest.fixture
+def run(db, llm):
+    """Run `scenario(client)` against the app on a fresh event loop."""
+    def runner(scenario):
+        async def go():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await scenario(client)
+        return asyncio.run(go())
+    return runner
+
+
+async def start_interview(client: httpx.AsyncClient) -> tuple:
+    """Register a user and start a session; returns (auth headers, session_id)."""
+    token = (await client.post(
+        "/auth/register", json={"name": "Test", "email": "test@example.com", "password": "secret1"},
+    )).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    session = (await client.post(
+        "/sessions/start",
+        data={"role": "Backend Engineer", "level": "senior", "rounds": "technical",
+              "job_description": "Build and run APIs"},
+        headers=headers,
+    )).json()
+    return headers, session["id"]
@@ -0,0 +1,27 @@
+import bcrypt
+from bson import ObjectId
+
+from utils import auth
+
+
+def test_login_rehash_drops_the_cached_profile_and_cache_counters_are_exported(run, db):
+    async def scenario(client):
+        body = {"name": "Ada", "email": "ada@example.com", "password": "correct horse"}
+        token = (await client.post("/auth/register", json=body)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        before = await client.get("/auth/me", headers=headers)
+
+        # An older work factor makes the next login rehash; the rename lands with it
+        old_hash = bcrypt.hashpw(body["password"].encode(), bcrypt.gensalt(auth.BCRYPT_ROUNDS + 1)).decode()
+        await db["users"].update_one(
+            {"_id": ObjectId(before.json()["id"])}, {"$set": {"hashed_password": old_hash, "name": "Ada L."}},
+        )
+        await client.post("/auth/login", json={"email": body["email"], "password": body["password"]})
+        after = await client.get("/auth/me", headers=headers)
+        return before, after, (await client.get("/metrics")).text
+
+    before, after, metrics = run(scenario)
+    assert before.json()["name"] == "Ada"
+    assert after.json()["name"] == "Ada L."
+    assert 'interviewiq_auth_cache_lookups_total{cache="users",result="miss"}' in metrics
+    assert 'interviewiq_auth_cache_entries{cache="tokens"}' in metrics
@@ -0,0 +1,31 @@
+from services import gemini
+from services.context import build_context
+
+
+def _history(turns: int, chars: int = 400):
+    history = []
+    for i in range(turns):
+        history.append({"role": "ai", "content": f"Question {i}: " + "q" * chars})
+        history.append({"role": "user", "content": f"Answer {i}: " + "a" * chars, "score": 6})
+    return history
+
+
+def test_long_job_description_does_not_wipe_the_summary():
+    history = _history(5)
+    messages, state = gemini._turn_messages(
+        "Backend Engineer", "senior", "technical", "resume " * 400, "jd " * 5000, history, 5, "", 0,
+    )
+    assert len(messages[0]["content"]) < 10000    # JD clipped in the prefix
+    assert state["summarized"] == 4
+    assert len(state["summary"].splitlines()) == 4
+    assert messages[-3]["content"] == history[-2]["content"]     # the question the answer replies to
+    assert messages[-2]["content"] == history[-1]["content"]
+
+
+def test_summary_trimmed_for_the_prompt_is_still_stored():
+    summary = "\n".join(f"- Interviewer asked: {'x' * 170}" for _ in range(40))
+    window, prompt_summary, stored, summarized = build_context(_history(1, 2000), summary, 40, budget=1200)
+    assert [m["role"] for m in window] == ["ai", "user"]
+    assert len(prompt_summary.splitlines()) < 40
+    assert stored == summary
+    assert summarized == 40
@@ -0,0 +1,36 @@
+from bson import ObjectId
+
+from tests.conftest import start_interview
+
+
+async def _completed_session(client, db, **report):
+    headers, session_id = await start_interview(client)
+    await client.post("/interview/message", json={"session_id": session_id, "content": "Hello"}, headers=headers)
+    await client.post(f"/interview/end/{session_id}", headers=headers)
+    await db["sessions"].update_one({"_id": ObjectId(session_id)}, {"$set": report})
+    return headers, session_id
+
+
+def test_get_reports_the_job_while_a_fallback_report_is_regenerated(run, db):
+    async def scenario(client):
+        headers, session_id = await _completed_session(
+            client, db, overall_score=50.0, summary="fallback", report_hash=None, report_fallback=True,
+        )
+        generate = await client.post(f"/feedback/generate/{session_id}", headers=headers)
+        poll = await client.get(f"/feedback/{session_id}", headers=headers)
+        return generate, poll
+
+    generate, poll = run(scenario)
+    assert generate.status_code == 202
+    assert poll.status_code == 202
+    assert poll.json()["status"] == "queued"
+
+
+def test_a_score_of_zero_is_a_generated_report(run, db):
+    async def scenario(client):
+        headers, session_id = await _completed_session(client, db, overall_score=0.0, summary="real")
+        return await client.get(f"/feedback/{session_id}", headers=headers)
+
+    response = run(scenario)
+    assert response.status_code == 200
+    assert response.json()["overall_score"] == 0.0
@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import pytest
+
+from services.gemini import _ReplyExtractor
+from tests.conftest import start_interview
+
+EMOJI_REPLY = '{"reply": "Great \\ud83d\\ude00 now tell me more", "score": 7, "feedback": "ok", ' \
+              '"weak_points": [], "is_follow_up": false}'
+
+
+def _events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 13, 1000])
+def test_reply_extractor_joins_surrogate_pairs_across_chunks(size):
+    extractor = _ReplyExtractor()
+    text = "".join(extractor.feed(EMOJI_REPLY[i:i + size]) for i in range(0, len(EMOJI_REPLY), size))
+    assert text == "Great 😀 now tell me more"
+
+
+def test_reply_extractor_replaces_lone_surrogates():
+    extractor = _ReplyExtractor()
+    assert extractor.feed('{"reply": "a \\ud83d b \\ude00"}') == "a � b �"
+
+
+def test_stream_with_escaped_emoji_is_delivered_and_saved(run, llm, db):
+    llm.reply_json = EMOJI_REPLY
+
+    async def scenario(client):
+        headers, session_id = await start_interview(client)
+        response = await client.post(
+            "/interview/message/stream", json={"session_id": session_id, "content": "Hello"}, headers=headers,
+        )
+        return session_id, response
+
+    session_id, response = run(scenario)
+    assert response.status_code == 200
+    events = _events(response.text)
+    assert [name for name, _ in events if name != "token"] == ["turn"]
+    assert "".join(data["delta"] for name, data in events if name == "token") == "Great 😀 now tell me more"
+    assert events[-1][1]["message"]["content"] == "Great 😀 now tell me more"
+
+    saved = asyncio.run(db["messages"].find_one({"session_id": session_id, "role": "ai"}))
+    assert saved["content"] == "Great 😀 now tell me more"
+
@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+from services.model_router import LLM_BREAKER_FAILURES, ModelRouter
+from utils.metrics import LLM_ROUTE_OUTCOMES, render_metrics, on_collect
+
+
+class _Unavailable(Exception):
+    status_code = 503
+
+
+def test_half_open_circuit_lets_one_trial_through():
+    router = ModelRouter(["primary-model", "backup-model"], hedge=False)
+    on_collect(router.export_metrics)
+    calls = []
+
+    async def scenario():
+        async def failing(model):
+            if model == "primary-model":
+                raise _Unavailable()
+            return model
+
+        for _ in range(LLM_BREAKER_FAILURES):
+            await router.run("test", failing)
+        assert router.stats()["models"]["primary-model"]["state"] == "open"
+        assert 'interviewiq_llm_circuit_state{model="primary-model"} 2' in render_metrics()
+
+        router._stats["primary-model"].open_until = time.monotonic() - 1      # cooldown over
+        gate = asyncio.Event()
+
+        async def slow(model):
+            calls.append(model)
+            await gate.wait()
+            return model
+
+        runs = [asyncio.create_task(router.run("test", slow)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        gate.set()
+        return await asyncio.gather(*runs)
+
+    results = asyncio.run(scenario())
+    assert calls.count("primary-model") == 1
+    assert [model for model, _ in results].count("backup-model") == 4
+    assert router.stats()["models"]["primary-model"]["state"] == "closed"
+    assert not router._stats["primary-model"].trial_in_flight
+    assert LLM_ROUTE_OUTCOMES._series[("primary-model", "primary", "failed")] == LLM_BREAKER_FAILURES
+    assert LLM_ROUTE_OUTCOMES._series[("backup-model", "failover", "won")] == LLM_BREAKER_FAILURES
+    assert 'interviewiq_llm_circuit_state{model="primary-model"} 0' in render_metrics()
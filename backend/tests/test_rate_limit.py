@@ -0,0 +1,24 @@
+import asyncio
+
+from tests.conftest import start_interview
+
+
+def _last_event(body: str) -> str:
+    return body.strip().split("\n\n")[-1].split("\n")[0].split(": ", 1)[1]
+
+
+def test_second_concurrent_stream_is_rejected(run, llm):
+    async def scenario(client):
+        headers, session_id = await start_interview(client)
+        llm.gate = asyncio.Event()
+        body = {"session_id": session_id, "content": "Hello"}
+        first = asyncio.create_task(client.post("/interview/message/stream", json=body, headers=headers))
+        await asyncio.sleep(0.2)     # first stream is open, waiting on the model
+        second = await client.post("/interview/message/stream", json=body, headers=headers)
+        llm.gate.set()
+        return await first, second
+
+    first, second = run(scenario)
+    assert second.status_code == 429
+    assert first.status_code == 200
+    assert _last_event(first.text) == "turn"
@@ -0,0 +1,37 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from services.user_stats import apply_report_stats, report_contribution
+
+_TRANSCRIPT = [{"role": "ai", "content": "Q"}, {"role": "user", "content": "A", "weak_points": []}]
+
+
+async def _score(db, session, overall):
+    """Save a report on `session` the way save_generated_report does and apply its stats."""
+    contribution = report_contribution(session, {"overall_score": overall, "category_scores": {}}, _TRANSCRIPT)
+    await db["sessions"].update_one({"_id": session["_id"]}, {"$set": {"stats_contribution": contribution}})
+    await apply_report_stats(db, "u1", str(session["_id"]), session.get("stats_contribution"), contribution)
+    session["stats_contribution"] = contribution
+
+
+def test_rescoring_lowers_best_score_and_keeps_last_score_in_session_order(db):
+    start = datetime(2026, 1, 1)
+    sessions = [
+        {"_id": ObjectId(), "user_id": "u1", "role": "Backend", "completed_at": start + timedelta(days=i)}
+        for i in range(2)
+    ]
+
+    async def scenario():
+        await db["sessions"].insert_many(sessions)
+        await _score(db, sessions[0], 90.0)
+        await _score(db, sessions[1], 60.0)
+        await _score(db, sessions[0], 70.0)     # re-scored after the newer session
+        return await db["user_stats"].find_one({"_id": "u1"})
+
+    stats = asyncio.run(scenario())
+    assert stats["best_score"] == 70.0
+    assert stats["last_score"] == 60.0
+    assert [p["score"] for p in stats["recent_scores"]] == [70.0, 60.0]
+    assert stats["sessions_scored"] == 2
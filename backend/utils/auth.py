@@ -1,5 +1,8 @@
 import os
+import time
+import asyncio
 import bcrypt
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -7,23 +10,60 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 
+from db.mongo import get_db
+from db import repository
+from utils.cache import LRUCache
+from utils.metrics import AUTH_CACHE_ENTRIES, AUTH_CACHE_LOOKUPS, on_collect
+
 load_dotenv()
 
 JWT_SECRET = os.getenv("JWT_SECRET", "fallback-secret-change-me")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "10080"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", "2"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "2048"))
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "300"))   # 0 disables the profile cache
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
 
 bearer_scheme = HTTPBearer()
 
+# bcrypt releases the GIL, so a small dedicated pool keeps hashing off the event
+# loop without letting a login burst take over the default executor
+_hash_pool = ThreadPoolExecutor(max_workers=AUTH_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+# Verified JWT claims (until the token's exp) and user profiles, per process
+_token_cache = LRUCache(TOKEN_CACHE_SIZE)
+_user_cache = LRUCache(USER_CACHE_SIZE)
+
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
 
 
-def verify_password(plain: str, hashed: str) -> bool:
+def _verify(plain: str, hashed: str) -> bool:
     return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
 
 
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, _hash, password, BCRYPT_ROUNDS)
+
+
+async def verify_password(plain: str, hashed: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, _verify, plain, hashed)
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True if the hash was made with a different work factor than BCRYPT_ROUNDS."""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -43,12 +83,59 @@ def decode_token(token: str) -> dict:
         )
 
 
+def _verified_claims(token: str) -> dict:
+    """decode_token, skipping the signature check for tokens already verified by this process."""
+    payload = _token_cache.get(token)
+    if payload is None:
+        payload = decode_token(token)
+        if isinstance(payload.get("exp"), (int, float)):
+            _token_cache.set(token, payload, payload["exp"])
+    return payload
+
+
+def invalidate_user(user_id: str):
+    """Drop the cached profile and every cached token for a user (e.g. after a profile change)."""
+    _user_cache.pop(user_id)
+    _token_cache.pop_where(lambda payload: payload.get("sub") == user_id)
+
+
+def auth_cache_stats() -> dict:
+    return {"tokens": _token_cache.stats(), "users": _user_cache.stats()}
+
+
+def _export_cache_metrics():
+    for cache, stats in auth_cache_stats().items():
+        AUTH_CACHE_LOOKUPS.set(stats["hits"], cache=cache, result="hit")
+        AUTH_CACHE_LOOKUPS.set(stats["misses"], cache=cache, result="miss")
+        AUTH_CACHE_ENTRIES.set(stats["size"], cache=cache)
+
+
+on_collect(_export_cache_metrics)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
 ):
     """FastAPI dependency — returns the user_id from the JWT."""
-    payload = decode_token(credentials.credentials)
+    payload = _verified_claims(credentials.credentials)
     user_id: str = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token payload")
     return user_id
+
+
+async def get_current_user_profile(user_id: str = Depends(get_current_user)) -> Optional[dict]:
+    """FastAPI dependency — the user's profile (name, email, created_at), cached for USER_CACHE_TTL_SECONDS."""
+    user = _user_cache.get(user_id) if USER_CACHE_TTL_SECONDS else None
+    if user is None:
+        user = await repository.get_user(get_db(), user_id)
+        if user and USER_CACHE_TTL_SECONDS:
+            _user_cache.set(user_id, user, time.time() + USER_CACHE_TTL_SECONDS)
+    return user
+
+
+async def get_admin_user(user: Optional[dict] = Depends(get_current_user_profile)) -> dict:
+    """FastAPI dependency — the caller's profile, or 403 unless their email is in ADMIN_EMAILS."""
+    if not user or user["email"].lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
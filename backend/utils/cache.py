@@ -0,0 +1,45 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """Small LRU map with a per-entry expiry time and hit/miss counters."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any, expires_at: float):
+        """Store `value` until the unix timestamp `expires_at`."""
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def pop_where(self, predicate):
+        """Drop every entry whose value matches predicate(value)."""
+        for key in [k for k, (v, _) in self._entries.items() if predicate(v)]:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -1,4 +1,12 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
 from bson import ObjectId
+from bson.errors import InvalidId
 
 
 def doc_to_dict(doc: dict) -> dict:
@@ -14,3 +22,36 @@ def str_to_object_id(id_str: str) -> ObjectId:
         return ObjectId(id_str)
     except Exception:
         return None
+
+
+def transcript_hash(transcript: List[Dict]) -> str:
+    """Stable SHA-256 of the parts of a transcript that feed the feedback report."""
+    payload = [[m["role"], m["content"], m.get("score")] for m in transcript]
+    return hashlib.sha256(json.dumps(payload, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def transcript_entry(msg: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalise a stored message into the transcript shape used by feedback."""
+    return {
+        "role": msg["role"],
+        "content": msg["content"],
+        "score": msg.get("score"),
+        "feedback": msg.get("feedback"),
+        "weak_points": msg.get("weak_points", []),
+    }
+
+
+def encode_cursor(created_at: datetime, doc_id: ObjectId) -> str:
+    """Opaque page token for keyset pagination on (created_at, _id)."""
+    payload = json.dumps([created_at.isoformat(), str(doc_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Optional[Tuple[datetime, ObjectId]]:
+    """Inverse of encode_cursor; None if the token is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), ObjectId(doc_id)
+    except (ValueError, TypeError, binascii.Error, InvalidId):
+        return None
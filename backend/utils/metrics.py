@@ -0,0 +1,176 @@
+"""
+Request and stage timings, LLM routing outcomes and auth cache counters,
+exported in Prometheus text format on /metrics.
+
+`span("stage.name")` times a block into the stage histogram. With
+OTEL_ENABLED=true and the OpenTelemetry packages installed, each span is
+also emitted as a trace span (exported over OTLP when the SDK and exporter
+are present; configure them with the standard OTEL_* variables).
+"""
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Sequence, Tuple
+
+OTEL_ENABLED = os.getenv("OTEL_ENABLED", "false").lower() == "true"
+
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names: Sequence[str], key: Tuple[str, ...]) -> str:
+    return ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, key))
+
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labels: Sequence[str], buckets: Sequence[float] = _BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List] = {}    # label values -> [bucket counts, sum, count]
+
+    def observe(self, seconds: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect_left(self.buckets, seconds)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += seconds
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self._series.items()):
+            labels = _label_text(self.labels, key)
+            prefix = labels + "," if labels else ""
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, doc: str, labels: Sequence[str]):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self._series: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        self._series[key] = self._series.get(key, 0) + amount
+
+    def set(self, value: float, **labels):
+        """For totals counted elsewhere and copied in by a collector."""
+        self._series[tuple(str(labels[name]) for name in self.labels)] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{{{_label_text(self.labels, key)}}} {value:g}")
+        return lines
+
+
+class Gauge(Counter):
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "interviewiq_http_request_duration_seconds",
+    "Time to response start per route.",
+    ("method", "route", "status"),
+)
+STAGE_SECONDS = Histogram(
+    "interviewiq_stage_duration_seconds",
+    "Time spent in each named stage of request handling.",
+    ("stage",),
+)
+
+LLM_ROUTE_OUTCOMES = Counter(
+    "interviewiq_llm_route_outcomes_total",
+    "LLM attempts per model by how they were routed (primary, hedge, failover) and how they ended "
+    "(won, failed, cancelled).",
+    ("model", "decision", "outcome"),
+)
+LLM_CIRCUIT_STATE = Gauge(
+    "interviewiq_llm_circuit_state",
+    "Circuit breaker state per LLM model: 0 closed, 1 half-open, 2 open.",
+    ("model",),
+)
+AUTH_CACHE_LOOKUPS = Counter(
+    "interviewiq_auth_cache_lookups_total",
+    "Verified-token and user-profile cache lookups per process, by result (hit, miss).",
+    ("cache", "result"),
+)
+AUTH_CACHE_ENTRIES = Gauge(
+    "interviewiq_auth_cache_entries",
+    "Entries held in each auth cache.",
+    ("cache",),
+)
+
+# Called before each scrape, for metrics that are read off live state rather than counted
+_collectors: List[Callable[[], None]] = []
+
+
+def on_collect(collector: Callable[[], None]):
+    _collectors.append(collector)
+
+
+def _init_tracer():
+    if not OTEL_ENABLED:
+        return None
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        print("⚠️  OTEL_ENABLED is set but opentelemetry-api is not installed")
+        return None
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        provider = TracerProvider(resource=Resource.create({"service.name": "interviewiq-api"}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        trace.set_tracer_provider(provider)
+        print("✅ OpenTelemetry OTLP exporter configured")
+    except ImportError:
+        print("⚠️  opentelemetry-sdk / OTLP exporter not installed; spans go to the global provider")
+    return trace.get_tracer("interviewiq")
+
+
+_tracer = _init_tracer()
+
+
+@contextmanager
+def span(name: str):
+    """Time a stage into interviewiq_stage_duration_seconds (and a trace span, if enabled)."""
+    started = time.perf_counter()
+    with _tracer.start_as_current_span(name) if _tracer else nullcontext():
+        try:
+            yield
+        finally:
+            STAGE_SECONDS.observe(time.perf_counter() - started, stage=name)
+
+
+def render_metrics() -> str:
+    for collect in _collectors:
+        collect()
+    metrics = (
+        REQUEST_SECONDS, STAGE_SECONDS, LLM_ROUTE_OUTCOMES, LLM_CIRCUIT_STATE, AUTH_CACHE_LOOKUPS, AUTH_CACHE_ENTRIES,
+    )
+    return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
@@ -0,0 +1,129 @@
+"""
+Per-user rate limiting for the endpoints that spend LLM quota.
+
+Each limited scope gives every user a token bucket (a sustained rate plus a
+burst) and a cap on requests in flight at once. Rejections are 429s with a
+Retry-After header. State lives in a RateLimitBackend: the default keeps it
+in process memory; a shared store (e.g. Redis) implements the same three
+coroutines and is installed with set_rate_limit_backend().
+"""
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+from fastapi import Depends, HTTPException, status
+
+from utils.auth import get_current_user
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_TURNS_PER_MINUTE = float(os.getenv("RATE_LIMIT_TURNS_PER_MINUTE", "20"))
+RATE_LIMIT_TURN_BURST = int(os.getenv("RATE_LIMIT_TURN_BURST", "5"))
+RATE_LIMIT_TURNS_IN_FLIGHT = int(os.getenv("RATE_LIMIT_TURNS_IN_FLIGHT", "2"))
+RATE_LIMIT_REPORTS_PER_MINUTE = float(os.getenv("RATE_LIMIT_REPORTS_PER_MINUTE", "4"))
+RATE_LIMIT_REPORT_BURST = int(os.getenv("RATE_LIMIT_REPORT_BURST", "3"))
+RATE_LIMIT_REPORTS_IN_FLIGHT = int(os.getenv("RATE_LIMIT_REPORTS_IN_FLIGHT", "2"))
+
+
+class RateLimitBackend:
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from `key`'s bucket: 0 if granted, else seconds until one is available."""
+        raise NotImplementedError
+
+    async def acquire(self, key: str, limit: int) -> bool:
+        """Claim an in-flight slot for `key` unless `limit` are already held."""
+        raise NotImplementedError
+
+    async def release(self, key: str):
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process state; buckets for the least recently seen keys are dropped past max_keys."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()   # key -> (tokens, at)
+        self._in_flight: Dict[str, int] = {}
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, at = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - at) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)   # a full bucket is the same as no bucket
+        return wait
+
+    async def acquire(self, key: str, limit: int) -> bool:
+        held = self._in_flight.get(key, 0)
+        if held >= limit:
+            return False
+        self._in_flight[key] = held + 1
+        return True
+
+    async def release(self, key: str):
+        held = self._in_flight.get(key, 0) - 1
+        if held > 0:
+            self._in_flight[key] = held
+        else:
+            self._in_flight.pop(key, None)
+
+
+_backend: RateLimitBackend = MemoryRateLimitBackend()
+
+
+def set_rate_limit_backend(backend: RateLimitBackend):
+    global _backend
+    _backend = backend
+
+
+def _too_many(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def rate_limit(scope: str, per_minute: float, burst: int, max_in_flight: int):
+    """
+    Dependency that authenticates like get_current_user, then enforces the
+    scope's limits. The in-flight slot is held until the response (including
+    a streamed one) has been sent — FastAPI runs yield-dependency exit code
+    after the response only from 0.118, hence the floor in requirements.txt.
+    """
+    rate = per_minute / 60
+
+    async def limited_user(user_id: str = Depends(get_current_user)):
+        if not RATE_LIMIT_ENABLED:
+            yield user_id
+            return
+
+        key = f"{scope}:{user_id}"
+        if not await _backend.acquire(key, max_in_flight):
+            raise _too_many(f"Too many {scope} requests in progress", 1)
+        try:
+            wait = await _backend.take(key, rate, burst)
+            if wait > 0:
+                raise _too_many(f"Too many {scope} requests, retry in {math.ceil(wait)}s", wait)
+            yield user_id
+        finally:
+            await _backend.release(key)
+
+    return limited_user
+
+
+limit_turns = rate_limit(
+    "interview", RATE_LIMIT_TURNS_PER_MINUTE, RATE_LIMIT_TURN_BURST, RATE_LIMIT_TURNS_IN_FLIGHT,
+)
+limit_reports = rate_limit(
+    "feedback", RATE_LIMIT_REPORTS_PER_MINUTE, RATE_LIMIT_REPORT_BURST, RATE_LIMIT_REPORTS_IN_FLIGHT,
+)
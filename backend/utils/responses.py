@@ -0,0 +1,36 @@
+"""
+orjson-backed JSON responses.
+
+FastJSONResponse is the app's default response class. It renders with orjson,
+which handles datetimes, enums, dicts and lists natively. Routes that build
+their payload from data we stored or validated ourselves return a
+FastJSONResponse of plain dicts shaped like their response_model. FastAPI
+then skips its response_model validation and jsonable_encoder passes, and
+the model still documents the route in OpenAPI.
+bench/bench_serialization.py measures the difference.
+"""
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any):
+    if isinstance(value, BaseModel):
+        return dict(value)
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serialisable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
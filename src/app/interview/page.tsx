@@ -38,6 +38,8 @@ function InterviewContent() {
     const [userCaption, setUserCaption] = useState("");
     const [isAiProcessing, setIsAiProcessing] = useState(false);
     const [input, setInput] = useState("");
+    // The server only saves an answer together with the AI reply, so a failed send keeps it here for a retry
+    const [failedAnswer, setFailedAnswer] = useState("");
 
     const { speak, stop: stopSpeech, isSpeaking: isAiSpeaking } = useSpeechOutput();
 
@@ -92,6 +94,7 @@ function InterviewContent() {
         if (!text || !sessionId || isAiProcessing) return;
 
         setInput("");
+        setFailedAnswer("");
         setUserCaption(text);
         stopSpeech();
         if (isListening) stopListening();
@@ -105,7 +108,9 @@ function InterviewContent() {
             setAiCaption(result.message.content);
             speak(result.message.content);
         } catch {
-            setAiCaption("Failed to get response. Please try again.");
+            setInput(text);
+            setFailedAnswer(text);
+            setAiCaption("Failed to get response. Your answer was not saved — retry or edit it below.");
         } finally {
             setIsAiProcessing(false);
         }
@@ -234,6 +239,15 @@ function InterviewContent() {
                                 </button>
                             </div>
 
+                            {failedAnswer && !isAiProcessing && (
+                                <button
+                                    onClick={() => sendMessage(failedAnswer)}
+                                    className="w-full py-2 bg-dark-400 text-lime border border-lime/50 rounded hover:bg-dark-500 uppercase font-bold text-xs tracking-wider transition-colors"
+                                >
+                                    Retry last answer
+                                </button>
+                            )}
+
                             <div className="relative">
                                 <input
                                     type="text"
@@ -135,12 +135,35 @@ export type FeedbackReport = {
     }>;
 };
 
+export type FeedbackJob = {
+    job_id: string;
+    session_id: string;
+    status: "queued" | "running" | "done" | "failed";
+    attempts: number;
+    error?: string | null;
+};
+
+const FEEDBACK_POLL_MS = 2000;
+
+// GET /feedback answers 202 with the job while a report is queued, running or failed without one
+async function untilReport(session_id: string, res: FeedbackReport | FeedbackJob): Promise<FeedbackReport> {
+    while ("job_id" in res) {
+        if (res.status === "failed") throw new Error(res.error || "Feedback generation failed");
+        await new Promise((resolve) => setTimeout(resolve, FEEDBACK_POLL_MS));
+        res = await request<FeedbackReport | FeedbackJob>(`/feedback/${session_id}`);
+    }
+    return res;
+}
+
 export const feedbackApi = {
-    generate: (session_id: string) =>
-        request<FeedbackReport>(`/feedback/generate/${session_id}`, { method: "POST" }),
+    // Report generation runs as a background job — poll until the report is ready
+    generate: async (session_id: string): Promise<FeedbackReport> =>
+        untilReport(session_id, await request<FeedbackReport | FeedbackJob>(`/feedback/generate/${session_id}`, { method: "POST" })),
+
+    job: (job_id: string) => request<FeedbackJob>(`/feedback/jobs/${job_id}`),
 
-    get: (session_id: string) =>
-        request<FeedbackReport>(`/feedback/${session_id}`),
+    get: async (session_id: string): Promise<FeedbackReport> =>
+        untilReport(session_id, await request<FeedbackReport | FeedbackJob>(`/feedback/${session_id}`)),
 };
 
 // ─── Token helpers ─────────────────────────────────────────────────────────────